@@ -0,0 +1 @@
+"""Benchmarks for the Clean Code in Python exercises."""
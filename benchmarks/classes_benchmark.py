@@ -0,0 +1,257 @@
+"""Benchmark of the refactored classes exercises across data sizes.
+
+Measures the standardize → train → evaluate path of `exercises/classes/01_linear_regression_refactored.py` and the
+metric path of `exercises/classes/02_calculate_metric_refactored.py` on synthetic data. Every stage records its wall
+time, its peak memory, and the number and size of the memory blocks it allocated that are still alive after it, e.g.
+its result, including NumPy and pandas buffers. The results are written as JSON.
+
+Run the benchmark and compare two runs with:
+
+    python -m benchmarks.classes_benchmark run --output baseline.json
+    python -m benchmarks.classes_benchmark run --output candidate.json
+    python -m benchmarks.classes_benchmark compare baseline.json candidate.json
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+linear_regression = importlib.import_module("exercises.classes.01_linear_regression_refactored")
+calculate_metric = importlib.import_module("exercises.classes.02_calculate_metric_refactored")
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_FEATURES = [5, 50, 500]
+
+
+@dataclass
+class StageResult:
+    """Measurements of a single benchmark stage."""
+
+    suite: str
+    stage: str
+    rows: int
+    features: int
+    wall_time_seconds: float
+    peak_memory_bytes: int
+    allocated_blocks: int
+    allocated_bytes: int
+
+
+def generate_regression_data(rows: int, features: int, seed: int) -> pd.DataFrame:
+    """Generate a data frame of normally distributed features and a linear, noisy target."""
+    random_generator = np.random.default_rng(seed)
+    feature_values = random_generator.normal(size=(rows, features))
+    target = feature_values @ random_generator.normal(size=features) + random_generator.normal(size=rows)
+    data = pd.DataFrame(feature_values, columns=[f"feature{column}" for column in range(features)])
+    data["target"] = target
+    return data
+
+
+def measure(function: Callable[[], Any], repeat: int) -> tuple[float, int, int, int, Any]:
+    """Measure a function call.
+
+    The wall time is the best of `repeat` untraced calls. The memory is measured by one additional call traced with
+    `tracemalloc`, since tracing slows down the call. The allocations are the difference of `tracemalloc` snapshots
+    before and after the call, which also cover the buffers of NumPy and pandas.
+
+    :return: Wall time in seconds, peak memory in bytes, number and size in bytes of the memory blocks allocated by
+        the call that are still alive after it, and the result of the call.
+    """
+    wall_times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        wall_times.append(time.perf_counter() - start)
+
+    gc.collect()
+    snapshot_filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    tracemalloc.start()
+    try:
+        snapshot_before = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+        tracemalloc.reset_peak()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        result = function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        snapshot_after = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+    finally:
+        tracemalloc.stop()
+    statistic_differences = snapshot_after.compare_to(snapshot_before, "filename")
+    allocated_blocks = sum(difference.count_diff for difference in statistic_differences)
+    allocated_bytes = sum(difference.size_diff for difference in statistic_differences)
+    return min(wall_times), peak_memory - start_memory, allocated_blocks, allocated_bytes, result
+
+
+def benchmark_linear_regression(rows: int, features: int, seed: int, repeat: int) -> Iterator[StageResult]:
+    """Benchmark the standardize, train and evaluate stages of the linear regression exercise."""
+    data = generate_regression_data(rows, features, seed)
+
+    def standardize() -> pd.DataFrame:
+        standardizer = linear_regression.TrainingDataStandardizer(data)
+        standardizer.standardize()
+        return standardizer.data
+
+    wall_time, peak_memory, allocated_blocks, allocated_bytes, standardized_data = measure(standardize, repeat)
+    yield StageResult("linear_regression", "standardize", rows, features, wall_time, peak_memory, allocated_blocks,
+                      allocated_bytes)
+
+    target = standardized_data["target"]
+    feature_data = standardized_data[standardized_data.columns.difference(["target"])]
+
+    def train() -> object:
+        return linear_regression.LinearRegressionTrainer().train(feature_data, target)
+
+    wall_time, peak_memory, allocated_blocks, allocated_bytes, model = measure(train, repeat)
+    yield StageResult("linear_regression", "train", rows, features, wall_time, peak_memory, allocated_blocks,
+                      allocated_bytes)
+
+    def evaluate() -> float:
+        return linear_regression.MeanSquaredErrorEvaluator.evaluate(model, feature_data, target)
+
+    wall_time, peak_memory, allocated_blocks, allocated_bytes, _ = measure(evaluate, repeat)
+    yield StageResult("linear_regression", "evaluate", rows, features, wall_time, peak_memory, allocated_blocks,
+                      allocated_bytes)
+
+
+def benchmark_calculate_metric(rows: int, features: int, seed: int, repeat: int) -> Iterator[StageResult]:
+    """Benchmark fitting and calculating the metric of the classifier and regressor models."""
+    data = generate_regression_data(rows, features, seed)
+    feature_values = data.drop(columns="target").to_numpy()
+    targets = {
+        "regressor": data["target"].to_numpy(),
+        "classifier": (data["target"].to_numpy() > 0).astype(np.int64),
+    }
+    del data
+
+    for suite, model_class in [("regressor", calculate_metric.RegressorModel),
+                               ("classifier", calculate_metric.ClassifierModel)]:
+        model = model_class()
+        target = targets[suite]
+
+        wall_time, peak_memory, allocated_blocks, allocated_bytes, _ = measure(
+            lambda: model.model.fit(feature_values, target),
+            repeat,
+        )
+        yield StageResult(f"calculate_metric_{suite}", "fit", rows, features, wall_time, peak_memory,
+                          allocated_blocks, allocated_bytes)
+
+        wall_time, peak_memory, allocated_blocks, allocated_bytes, _ = measure(
+            lambda: model.calculate_metric(feature_values, target),
+            repeat,
+        )
+        yield StageResult(f"calculate_metric_{suite}", "calculate_metric", rows, features, wall_time, peak_memory,
+                          allocated_blocks, allocated_bytes)
+
+
+def run(rows_grid: list[int], features_grid: list[int], seed: int, repeat: int, max_bytes: int) -> dict[str, Any]:
+    """Run all benchmarks on the grid of data sizes, skipping sizes whose feature matrix exceeds `max_bytes`."""
+    results = []
+    for rows in rows_grid:
+        for features in features_grid:
+            data_bytes = rows * (features + 1) * np.dtype(np.float64).itemsize
+            if data_bytes > max_bytes:
+                print(f"Skipping {rows} rows x {features} features: {data_bytes} bytes exceed {max_bytes} bytes.")
+                continue
+            for benchmark in (benchmark_linear_regression, benchmark_calculate_metric):
+                for result in benchmark(rows, features, seed, repeat):
+                    print(f"{result.suite:<28} {result.stage:<18} {rows:>10} x {features:<4} "
+                          f"{result.wall_time_seconds:10.4f} s {result.peak_memory_bytes / 1024 ** 2:10.1f} MiB")
+                    results.append(asdict(result))
+
+    return {
+        "metadata": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scikit-learn": sklearn.__version__,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict[str, Any], candidate: dict[str, Any], threshold: float) -> list[str]:
+    """Compare two benchmark runs.
+
+    :param baseline: Results of the baseline run.
+    :param candidate: Results of the candidate run.
+    :param threshold: Relative increase of wall time, peak memory or allocated bytes above which a stage counts as a
+        regression. Measurements that are missing in one of the runs, e.g. of older runs, are not compared.
+    :return: Descriptions of the regressed stages.
+    """
+    def key(result: dict[str, Any]) -> tuple[str, str, int, int]:
+        return result["suite"], result["stage"], result["rows"], result["features"]
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for candidate_result in candidate["results"]:
+        baseline_result = baseline_results.get(key(candidate_result))
+        if baseline_result is None:
+            continue
+        for measurement in ("wall_time_seconds", "peak_memory_bytes", "allocated_bytes"):
+            if measurement not in baseline_result or measurement not in candidate_result:
+                continue
+            baseline_value, candidate_value = baseline_result[measurement], candidate_result[measurement]
+            change = (candidate_value - baseline_value) / baseline_value if baseline_value > 0 else 0.0
+            suite, stage, rows, features = key(candidate_result)
+            line = (f"{suite:<28} {stage:<18} {rows:>10} x {features:<4} {measurement:<18} "
+                    f"{baseline_value:>14.4f} -> {candidate_value:>14.4f} ({change:+.1%})")
+            print(line)
+            if change > threshold:
+                regressions.append(line)
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark command line interface."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write the results as JSON.")
+    run_parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    run_parser.add_argument("--features", type=int, nargs="+", default=DEFAULT_FEATURES)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--repeat", type=int, default=3, help="Number of timed calls per stage.")
+    run_parser.add_argument("--max-bytes", type=int, default=2 * 1024 ** 3,
+                            help="Skip data sizes whose feature matrix exceeds this number of bytes.")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two runs and flag regressions.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative increase that counts as a regression.")
+
+    arguments = parser.parse_args()
+    if arguments.command == "run":
+        results = run(arguments.rows, arguments.features, arguments.seed, arguments.repeat, arguments.max_bytes)
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+        return 0
+
+    with open(arguments.baseline) as baseline_file, open(arguments.candidate) as candidate_file:
+        regressions = compare(json.load(baseline_file), json.load(candidate_file), arguments.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {arguments.threshold:.0%}:")
+        print("\n".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
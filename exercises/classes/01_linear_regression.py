@@ -9,17 +9,89 @@ Make sure you take the following aspects into consideration:
         - What consequence can this assumption have and how could you prevent it?
 """
 
+import itertools
+from collections import OrderedDict
+from typing import Hashable
+
+import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 
 
+class PredictionCache:
+    """Least recently used cache of predictions with a memory budget."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 ** 2):
+        """Initialize an empty cache that holds at most `max_bytes` of predictions."""
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        """Return the cached predictions for the key and mark them as recently used."""
+        predictions = self._entries.get(key)
+        if predictions is not None:
+            self._entries.move_to_end(key)
+        return predictions
+
+    def put(self, key: Hashable, predictions: np.ndarray) -> None:
+        """Cache predictions, evicting the least recently used ones when over the memory budget."""
+        if predictions.nbytes > self.max_bytes:
+            return
+        self.pop(key)
+        self._entries[key] = predictions
+        self.size_bytes += predictions.nbytes
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= evicted.nbytes
+
+    def pop(self, key: Hashable) -> None:
+        """Remove the predictions for the key, if cached."""
+        predictions = self._entries.pop(key, None)
+        if predictions is not None:
+            self.size_bytes -= predictions.nbytes
+
+    def clear(self) -> None:
+        """Remove all cached predictions."""
+        self._entries.clear()
+        self.size_bytes = 0
+
+
 class Model:
     """Linear Regression Model."""
 
-    def __init__(self, data: pd.DataFrame):
+    _cache_tokens = itertools.count()
+
+    def __init__(self, data: pd.DataFrame, prediction_cache: PredictionCache | None = None):
         """Initialize a model instance."""
         self.data = data
         self.model = None
+        self.prediction_cache = prediction_cache or PredictionCache()
+        self._cache_token = next(self._cache_tokens)
+        self._cache_key: tuple[int, int, int] | None = None
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """Data of the model."""
+        return self._data
+
+    @data.setter
+    def data(self, data: pd.DataFrame) -> None:
+        """Set new data, which invalidates the cached feature selection and predictions.
+
+        Mutating the data frame in place is not detected, assign the data again after doing so.
+        """
+        self._data = data
+        self._data_version = getattr(self, "_data_version", 0) + 1
+        self._features = None
+        self._evict_cached_predictions()
+
+    @property
+    def features(self) -> pd.Index:
+        """Feature columns of the data, selected once per data version."""
+        if self._features is None:
+            self._features = self.data.columns.difference(["target"])
+        return self._features
 
     def train(self) -> None:
         """Train linear regression model."""
@@ -27,16 +99,31 @@ class Model:
         self.data = (self.data - self.data.mean()) / self.data.std()
 
         # Train model
-        features = self.data.columns.difference(["target"])
-        self.model = LinearRegression().fit(self.data[features], self.data["target"])
+        self.model = LinearRegression().fit(self.data[self.features], self.data["target"])
+        self._evict_cached_predictions()
 
     def evaluate(self) -> float:
         """Evaluate model performance with Mean Squared Error (MSE)."""
-        features = self.data.columns.difference(["target"])
-        predictions = self.model.predict(self.data[features])
+        cache_key = (self._cache_token, self._data_version, self._model_fingerprint())
+        predictions = self.prediction_cache.get(cache_key)
+        if predictions is None:
+            predictions = self.model.predict(self.data[self.features])
+            self._evict_cached_predictions()
+            self.prediction_cache.put(cache_key, predictions)
+            self._cache_key = cache_key
         mean_squared_error = ((predictions - self.data["target"]) ** 2).mean()
         return mean_squared_error
 
+    def _evict_cached_predictions(self) -> None:
+        """Remove the predictions of this model from the cache, which other models may share."""
+        if getattr(self, "_cache_key", None) is not None:
+            self.prediction_cache.pop(self._cache_key)
+            self._cache_key = None
+
+    def _model_fingerprint(self) -> int:
+        """Cheap fingerprint of the trained model parameters."""
+        return hash((self.model.coef_.tobytes(), float(self.model.intercept_)))
+
 
 if __name__ == "__main__":
     input_data = {
@@ -1,6 +1,11 @@
 """Exercise 01_linear_regression.py - Refactored."""
-from typing import Any
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Iterable, Iterator, NamedTuple
 
+import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 
@@ -11,10 +16,162 @@ class TrainingDataStandardizer:
     def __init__(self, data: pd.DataFrame) -> None:
         """Instantiate a standardizer for training data."""
         self.data = data
+        self.columns: pd.Index | None = None
+        self.mean: np.ndarray | None = None
+        self.std: np.ndarray | None = None
+        self._float32_statistics: tuple[np.ndarray, np.ndarray] | None = None
 
     def standardize(self) -> None:
         """Standardize the data by removing the mean and dividing by standard deviation."""
-        self.data = (self.data - self.data.mean()) / self.data.std()
+        self.fit()
+        self.data = self.transform(self.data)
+
+    def fit(self, data: pd.DataFrame | None = None) -> None:
+        """Store the per-column mean and standard deviation of the training data.
+
+        :param data: Data to calculate the statistics on, defaults to the data of the standardizer.
+        """
+        data = self.data if data is None else data
+        self.columns = data.columns
+        self.mean = data.mean().to_numpy(dtype=np.float64)
+        self.std = data.std().to_numpy(dtype=np.float64)
+        self._float32_statistics = None
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Standardize a new batch of data with the fitted statistics."""
+        mean, std = self._fitted_statistics()
+        if not data.columns.equals(self.columns):
+            raise ValueError(f"Data columns {list(data.columns)} do not match {list(self.columns)}.")
+        values = data.to_numpy(dtype=np.float64)
+        return pd.DataFrame((values - mean) / std, index=data.index, columns=data.columns)
+
+    def transform_array(self, values: np.ndarray, inplace: bool = False) -> np.ndarray:
+        """Standardize a float32 array of shape (rows, columns) with the fitted statistics.
+
+        No intermediate arrays are allocated, the mean is subtracted and the inverse standard deviation multiplied
+        in place.
+
+        :param values: Array with the columns in the order of the fitted data.
+        :param inplace: Overwrite `values`, which then needs to be a writeable float32 array. Otherwise, the values are
+            copied into a new float32 array first.
+        """
+        if inplace:
+            if values.dtype != np.float32 or not values.flags.writeable:
+                raise ValueError("Only writeable float32 arrays can be standardized in place.")
+        else:
+            values = np.array(values, dtype=np.float32)
+
+        mean, inverse_std = self._fitted_float32_statistics()
+        np.subtract(values, mean, out=values)
+        np.multiply(values, inverse_std, out=values)
+        return values
+
+    def _fitted_statistics(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the fitted mean and standard deviation."""
+        if self.mean is None or self.std is None:
+            raise ValueError("The standardizer has to be fitted before transforming data.")
+        return self.mean, self.std
+
+    def _fitted_float32_statistics(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the fitted mean and inverse standard deviation as float32 arrays, computed once per fit."""
+        if self._float32_statistics is None:
+            mean, std = self._fitted_statistics()
+            self._float32_statistics = (mean.astype(np.float32), (1.0 / std).astype(np.float32))
+        return self._float32_statistics
+
+
+class ChunkedTrainingDataStandardizer:
+    """Standardizer for training data that does not fit into memory.
+
+    The mean and standard deviation are accumulated in a single pass over the chunks, using the numerically stable
+    parallel update of Welford's algorithm. Like `pd.DataFrame.mean` and `pd.DataFrame.std`, missing values are
+    skipped, so the statistics of every column are based on its own count of non-missing values. The chunks are
+    standardized lazily in a second pass, so that the peak memory depends on the chunk size only.
+    """
+
+    def __init__(self) -> None:
+        """Instantiate a standardizer without any statistics."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard the statistics of all chunks seen so far."""
+        self.columns: pd.Index | None = None
+        self.count: np.ndarray | None = None
+        self._running_mean: np.ndarray | None = None
+        self._sum_of_squared_deviations: np.ndarray | None = None
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Mean of the non-missing values seen so far per column, NaN for columns without any."""
+        if self._running_mean is None or self.count is None:
+            raise ValueError("The standardizer has to be fitted before calculating the mean.")
+        return np.where(self.count > 0, self._running_mean, np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Sample standard deviation of the data seen so far, as calculated by `pd.DataFrame.std`.
+
+        Columns with less than two non-missing values have a standard deviation of NaN.
+        """
+        if self._sum_of_squared_deviations is None or self.count is None:
+            raise ValueError("The standardizer has to be fitted before calculating the standard deviation.")
+        degrees_of_freedom = self.count - 1
+        variance = np.divide(self._sum_of_squared_deviations, degrees_of_freedom,
+                             out=np.full(len(self.count), np.nan), where=degrees_of_freedom > 0)
+        return np.sqrt(variance)
+
+    def fit(self, chunks: Iterable[pd.DataFrame]) -> None:
+        """Calculate the mean and standard deviation in one pass over the chunks, discarding previous statistics.
+
+        :param chunks: Iterable of data frames, e.g. `pd.read_csv(path, chunksize=100_000)`.
+        """
+        self.reset()
+        for chunk in chunks:
+            self.partial_fit(chunk)
+
+    def partial_fit(self, chunk: pd.DataFrame) -> None:
+        """Update the mean and standard deviation with a single chunk."""
+        self._check_columns(chunk)
+        values = chunk.to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        chunk_count = present.sum(axis=0)
+        chunk_sum = np.where(present, values, 0.0).sum(axis=0)
+        chunk_mean = np.divide(chunk_sum, chunk_count, out=np.zeros_like(chunk_sum), where=chunk_count > 0)
+        chunk_sum_of_squared_deviations = (np.where(present, values - chunk_mean, 0.0) ** 2).sum(axis=0)
+
+        if self.count is None or self._running_mean is None or self._sum_of_squared_deviations is None:
+            self.count = chunk_count
+            self._running_mean = chunk_mean
+            self._sum_of_squared_deviations = chunk_sum_of_squared_deviations
+            return
+
+        total_count = self.count + chunk_count
+        has_values = total_count > 0
+        delta = chunk_mean - self._running_mean
+        chunk_weight = np.divide(chunk_count, total_count, out=np.zeros_like(delta), where=has_values)
+        cross_weight = np.divide(self.count * chunk_count, total_count, out=np.zeros_like(delta), where=has_values)
+        self._running_mean = self._running_mean + delta * chunk_weight
+        self._sum_of_squared_deviations = (
+            self._sum_of_squared_deviations + chunk_sum_of_squared_deviations + delta ** 2 * cross_weight
+        )
+        self.count = total_count
+
+    def standardize(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Lazily standardize the chunks by removing the mean and dividing by standard deviation."""
+        if self.count is None:
+            raise ValueError("The standardizer has to be fitted before standardizing data.")
+        mean, std = self.mean, self.std
+        for chunk in chunks:
+            self._check_columns(chunk)
+            values = chunk.to_numpy(dtype=np.float64)
+            yield pd.DataFrame((values - mean) / std, index=chunk.index, columns=chunk.columns)
+
+    def _check_columns(self, chunk: pd.DataFrame) -> None:
+        """Check that all chunks share the columns of the first one."""
+        if self.columns is None:
+            self.columns = chunk.columns
+        elif not chunk.columns.equals(self.columns):
+            raise ValueError(f"Chunk columns {list(chunk.columns)} do not match {list(self.columns)}.")
 
 
 class LinearRegressionTrainer:
@@ -30,6 +187,86 @@ class LinearRegressionTrainer:
         return self.model
 
 
+class IncrementalLinearRegressionTrainer:
+    """Linear Regression trainer that is updated batch by batch.
+
+    Only the sufficient statistics of the least-squares problem are kept: the row count, the means and the centered
+    cross products XᵀX and Xᵀy. A batch update costs O(batch · features²) and solving costs O(features³),
+    independently of the number of rows seen so far.
+    """
+
+    def __init__(self) -> None:
+        """Instantiate a trainer without any statistics."""
+        self.model = None
+        self.count = 0
+        self.feature_names: np.ndarray | None = None
+        self._features_mean: np.ndarray | None = None
+        self._target_mean = 0.0
+        self._features_cross_product: np.ndarray | None = None
+        self._features_target_cross_product: np.ndarray | None = None
+
+    def partial_fit(self, features: pd.DataFrame, target: pd.Series) -> None:
+        """Update the sufficient statistics with a batch of rows."""
+        if isinstance(features, pd.DataFrame):
+            self.feature_names = np.asarray(features.columns, dtype=object)
+        feature_values = np.asarray(features, dtype=np.float64)
+        target_values = np.asarray(target, dtype=np.float64)
+        batch_count = len(feature_values)
+        if batch_count == 0:
+            return
+
+        batch_features_mean = feature_values.mean(axis=0)
+        batch_target_mean = target_values.mean()
+        centered_features = feature_values - batch_features_mean
+        batch_features_cross_product = centered_features.T @ centered_features
+        batch_features_target_cross_product = centered_features.T @ (target_values - batch_target_mean)
+
+        if self._features_mean is None:
+            self.count = batch_count
+            self._features_mean = batch_features_mean
+            self._target_mean = batch_target_mean
+            self._features_cross_product = batch_features_cross_product
+            self._features_target_cross_product = batch_features_target_cross_product
+            return
+
+        # Merge the centered cross products of both parts, see Chan et al. for the parallel variance algorithm
+        total_count = self.count + batch_count
+        weight = self.count * batch_count / total_count
+        features_delta = batch_features_mean - self._features_mean
+        target_delta = batch_target_mean - self._target_mean
+        self._features_cross_product = (
+            self._features_cross_product
+            + batch_features_cross_product
+            + np.outer(features_delta, features_delta) * weight
+        )
+        self._features_target_cross_product = (
+            self._features_target_cross_product
+            + batch_features_target_cross_product
+            + features_delta * target_delta * weight
+        )
+        self._features_mean = self._features_mean + features_delta * (batch_count / total_count)
+        self._target_mean = self._target_mean + target_delta * (batch_count / total_count)
+        self.count = total_count
+
+    def solve(self) -> object:
+        """Solve the least-squares problem for the rows seen so far and return a fitted linear regression model."""
+        if self._features_mean is None:
+            raise ValueError("The trainer needs at least one batch before solving.")
+        coefficients = np.linalg.lstsq(
+            self._features_cross_product,
+            self._features_target_cross_product,
+            rcond=None,
+        )[0]
+
+        self.model = LinearRegression()
+        self.model.coef_ = coefficients
+        self.model.intercept_ = self._target_mean - self._features_mean @ coefficients
+        self.model.n_features_in_ = len(coefficients)
+        if self.feature_names is not None:
+            self.model.feature_names_in_ = self.feature_names
+        return self.model
+
+
 class MeanSquaredErrorEvaluator:
     """Mean Squared Error evaluator."""
 
@@ -41,6 +278,168 @@ class MeanSquaredErrorEvaluator:
         return mean_squared_error
 
 
+class RegressionMetrics(NamedTuple):
+    """Regression metrics calculated by the streaming evaluator."""
+
+    mean_squared_error: float
+    mean_absolute_error: float
+    r2: float
+    max_error: float
+
+
+class StreamingRegressionEvaluator:
+    """Evaluator of several regression metrics in a single pass over chunks of predictions and targets.
+
+    Only running sums are kept, so the memory does not depend on the number of evaluated rows.
+    """
+
+    def __init__(self) -> None:
+        """Instantiate an evaluator without any evaluated rows."""
+        self.count = 0
+        self._sum_of_squared_errors = 0.0
+        self._sum_of_absolute_errors = 0.0
+        self._max_error = 0.0
+        self._target_mean = 0.0
+        self._target_sum_of_squared_deviations = 0.0
+
+    def update(self, predictions: Any, target: Any) -> None:
+        """Accumulate the errors of a chunk of predictions and targets."""
+        target_values = np.asarray(target, dtype=np.float64)
+        errors = np.asarray(predictions, dtype=np.float64) - target_values
+        chunk_count = len(errors)
+        if chunk_count == 0:
+            return
+
+        absolute_errors = np.abs(errors)
+        self._sum_of_squared_errors += float(errors @ errors)
+        self._sum_of_absolute_errors += float(absolute_errors.sum())
+        self._max_error = max(self._max_error, float(absolute_errors.max()))
+
+        # Welford update of the target variance, needed for the total sum of squares of R²
+        chunk_target_mean = float(target_values.mean())
+        centered_target = target_values - chunk_target_mean
+        total_count = self.count + chunk_count
+        delta = chunk_target_mean - self._target_mean
+        self._target_sum_of_squared_deviations += (
+            float(centered_target @ centered_target) + delta ** 2 * self.count * chunk_count / total_count
+        )
+        self._target_mean += delta * chunk_count / total_count
+        self.count = total_count
+
+    def evaluate(self, model: Any, chunks: Iterable[tuple[pd.DataFrame, pd.Series]]) -> RegressionMetrics:
+        """Predict and accumulate the errors of every chunk of features and target, then return the metrics."""
+        for features, target in chunks:
+            self.update(model.predict(features), target)
+        return self.result()
+
+    def result(self) -> RegressionMetrics:
+        """Return the metrics of all rows evaluated so far."""
+        if self.count == 0:
+            raise ValueError("No rows have been evaluated yet.")
+        if self._target_sum_of_squared_deviations > 0:
+            r2 = 1.0 - self._sum_of_squared_errors / self._target_sum_of_squared_deviations
+        else:
+            # Same convention as `sklearn.metrics.r2_score` for a constant target
+            r2 = 1.0 if self._sum_of_squared_errors == 0 else 0.0
+        return RegressionMetrics(
+            mean_squared_error=self._sum_of_squared_errors / self.count,
+            mean_absolute_error=self._sum_of_absolute_errors / self.count,
+            r2=r2,
+            max_error=self._max_error,
+        )
+
+
+class GroupedLinearRegressionTrainer:
+    """Trainer of one linear regression model per group, e.g. per customer segment.
+
+    The groups are trained and evaluated in a process pool. The data is copied once into shared memory, from which
+    the workers read their groups, so that the data frame is not pickled to every worker.
+    """
+
+    def __init__(self, max_workers: int | None = None, groups_per_task: int | None = None) -> None:
+        """Instantiate a grouped trainer.
+
+        :param max_workers: Number of worker processes, defaults to the number of CPUs.
+        :param groups_per_task: Number of groups sent to a worker at once, defaults to an even split of the groups
+            into four tasks per worker.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.groups_per_task = groups_per_task
+
+    def train(self, data: pd.DataFrame, group_key: str, target: str = "target") -> pd.DataFrame:
+        """Train and evaluate a linear regression model for every group.
+
+        :param data: Data with the features, the target and the group key column.
+        :param group_key: Name of the column to group the rows by.
+        :param target: Name of the target column.
+        :return: Data frame indexed by group, with the coefficients of every feature, the intercept, the Mean Squared
+            Error and the number of rows of each group. Like `pd.DataFrame.groupby`, rows with a missing group key are
+            dropped.
+        """
+        feature_columns = list(data.columns.difference([group_key, target]))
+        group_codes, group_labels = pd.factorize(data[group_key], sort=True)
+        grouped_rows = np.flatnonzero(group_codes >= 0)
+        row_order = grouped_rows[np.argsort(group_codes[grouped_rows], kind="stable")]
+        group_counts = np.bincount(group_codes[grouped_rows], minlength=len(group_labels))
+        group_stops = np.cumsum(group_counts)
+        group_starts = group_stops - group_counts
+        group_slices = list(zip(group_starts.tolist(), group_stops.tolist()))
+        group_index = pd.Index(group_labels, name=group_key)
+        result_columns = feature_columns + ["intercept", "mse", "count"]
+        if not group_slices:
+            return pd.DataFrame(np.empty((0, len(result_columns))), index=group_index,
+                                columns=result_columns).astype({"count": np.int64})
+
+        values = data[feature_columns + [target]].to_numpy(dtype=np.float64)[row_order]
+        values_shape = values.shape
+        shared_memory = SharedMemory(create=True, size=values.nbytes)
+        try:
+            shared_values = np.ndarray(values.shape, dtype=np.float64, buffer=shared_memory.buf)
+            shared_values[:] = values
+            del shared_values, values
+
+            groups_per_task = self.groups_per_task or max(1, -(-len(group_slices) // (4 * self.max_workers)))
+            tasks = [group_slices[start:start + groups_per_task]
+                     for start in range(0, len(group_slices), groups_per_task)]
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                task_results = executor.map(
+                    _train_shared_groups,
+                    repeat(shared_memory.name),
+                    repeat(values_shape),
+                    tasks,
+                )
+                results = np.vstack(list(chain(task_results, [np.empty((0, len(feature_columns) + 3))])))
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+        table = pd.DataFrame(results, index=group_index, columns=result_columns)
+        table["count"] = table["count"].astype(np.int64)
+        return table
+
+
+def _train_shared_groups(shared_memory_name: str, shape: tuple[int, int], group_slices: list[tuple[int, int]]
+                         ) -> np.ndarray:
+    """Train and evaluate the groups of a task on the data in shared memory, run in a worker process."""
+    shared_memory = SharedMemory(name=shared_memory_name)
+    try:
+        return _train_groups(np.ndarray(shape, dtype=np.float64, buffer=shared_memory.buf), group_slices)
+    finally:
+        shared_memory.close()
+
+
+def _train_groups(values: np.ndarray, group_slices: list[tuple[int, int]]) -> np.ndarray:
+    """Train and evaluate one model per group, returning its coefficients, intercept, MSE and row count."""
+    results = np.empty((len(group_slices), values.shape[1] + 2))
+    for row, (start, stop) in enumerate(group_slices):
+        features, target = values[start:stop, :-1], values[start:stop, -1]
+        model = LinearRegressionTrainer().train(features, target)
+        mean_squared_error = MeanSquaredErrorEvaluator.evaluate(model, features, target)
+        results[row, :-3] = model.coef_
+        results[row, -3:] = model.intercept_, mean_squared_error, stop - start
+    return results
+
+
 if __name__ == "__main__":
     input_data = {
         "feature1": [1, 2, 3, 4, 5],
@@ -56,6 +455,21 @@ if __name__ == "__main__":
     standardizer.standardize()
     print(f"Standardized data:\n {standardizer.data}")
 
+    # Standardize data chunk by chunk, e.g. when reading it with `pd.read_csv(path, chunksize=...)`
+    def read_chunks(chunk_size: int = 2) -> Iterator[pd.DataFrame]:
+        """Read the input data in chunks."""
+        for start in range(0, len(input_data), chunk_size):
+            yield input_data.iloc[start:start + chunk_size]
+
+    chunked_standardizer = ChunkedTrainingDataStandardizer()
+    chunked_standardizer.fit(read_chunks())
+    print(f"Standardized chunks:\n {pd.concat(chunked_standardizer.standardize(read_chunks()))}")
+
+    # Standardize new batches in place with the statistics of the training data
+    new_batch = np.array(input_data, dtype=np.float32)
+    standardizer.transform_array(new_batch, inplace=True)
+    print(f"Standardized float32 batch:\n {new_batch}")
+
     # Train model
     input_data_target = standardizer.data["target"]
     input_data_features = standardizer.data[standardizer.data.columns.difference(["target"])]
@@ -63,3 +477,21 @@ if __name__ == "__main__":
 
     # Calculate MSE
     MeanSquaredErrorEvaluator().evaluate(linear_model, input_data_features, input_data_target)
+
+    # Train model batch by batch
+    incremental_trainer = IncrementalLinearRegressionTrainer()
+    for batch_start in range(0, len(input_data_features), 2):
+        batch = slice(batch_start, batch_start + 2)
+        incremental_trainer.partial_fit(input_data_features.iloc[batch], input_data_target.iloc[batch])
+    incremental_model = incremental_trainer.solve()
+    print(f"MSE of incremental model: "
+          f"{MeanSquaredErrorEvaluator().evaluate(incremental_model, input_data_features, input_data_target)}")
+
+    # Calculate several metrics in one pass over chunks of the data
+    evaluation_chunks = ((input_data_features.iloc[start:start + 2], input_data_target.iloc[start:start + 2])
+                         for start in range(0, len(input_data_features), 2))
+    print(StreamingRegressionEvaluator().evaluate(linear_model, evaluation_chunks))
+
+    # Train one model per group
+    segmented_data = input_data.assign(segment=["a", "b", "a", "b", "a"])
+    print(GroupedLinearRegressionTrainer(max_workers=2).train(segmented_data, group_key="segment"))
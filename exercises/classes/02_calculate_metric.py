@@ -11,6 +11,7 @@ Make sure you take the following aspects into consideration:
 
 import logging
 from enum import Enum
+from typing import Any, Callable
 
 from sklearn.datasets import fetch_california_housing, load_iris
 from sklearn.linear_model import LinearRegression
@@ -26,32 +27,63 @@ class SupportedModels(Enum):
     regressor = LinearRegression
 
 
+class MetricRegistry:
+    """Registry mapping model types to the name and function of their metric.
+
+    Subclasses of a registered model type resolve to its metric through the method resolution order. The lookup is
+    done once per concrete model type and cached afterwards.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: dict[type, tuple[str, Callable]] = {}
+        self._resolved_metrics: dict[type, tuple[str, Callable]] = {}
+
+    def register(self, model_type: type, metric_name: str, metric_function: Callable) -> None:
+        """Register the metric of a model type, also for its subclasses without a metric of their own."""
+        self._metrics[model_type] = (metric_name, metric_function)
+        self._resolved_metrics.clear()
+
+    def resolve(self, model_type: type) -> tuple[str, Callable]:
+        """Return the metric name and function of a model type.
+
+        :raises NotImplementedError: If no metric is registered for the model type or any of its base classes.
+        """
+        try:
+            return self._resolved_metrics[model_type]
+        except KeyError:
+            pass
+
+        for base_type in model_type.__mro__:
+            if base_type in self._metrics:
+                metric = self._resolved_metrics[model_type] = self._metrics[base_type]
+                return metric
+        raise NotImplementedError(f"Metrics for {model_type.__name__} are not implemented.")
+
+
+metric_registry = MetricRegistry()
+metric_registry.register(SupportedModels.classifier.value, "Accuracy", accuracy_score)
+metric_registry.register(SupportedModels.regressor.value, "R²", r2_score)
+
+
 class Model:
     """Machine learning model class."""
 
-    def __init__(self, model):
+    def __init__(self, model, registry: MetricRegistry = metric_registry):
         """Initialize a Model class instance."""
         self.model = model
+        self.registry = registry
 
-    def calculate_metric(self, y_true, y_predicted):
+    def calculate_metric(self, y_true, y_predicted) -> Any:
         """Calculate metrics for a given model.
 
         :param y_true: True values of the model target.
         :param y_predicted: Predicted values of the model target.
         """
-        if isinstance(self.model, SupportedModels.classifier.value):
-            # Calculate accuracy for classifier
-            metric = accuracy_score(y_true, y_predicted)
-            logging.info(f"Model: {self.model.__class__.__name__}, "
-                         f"Accuracy: {metric:.4f}")
-        elif isinstance(self.model, SupportedModels.regressor.value):
-            # Calculate R² for regressor
-            metric = r2_score(y_true, y_predicted)
-            logging.info(f"Model: {self.model.__class__.__name__}, "
-                         f"R²: {metric:.4f}")
-        else:
-            raise NotImplementedError(f"Metrics for {self.model.__class__.__name__} "
-                                      f"are not implemented.")
+        metric_name, metric_function = self.registry.resolve(type(self.model))
+        metric = metric_function(y_true, y_predicted)
+        # The message is only formatted if INFO logging is enabled
+        logging.info("Model: %s, %s: %.4f", self.model.__class__.__name__, metric_name, metric)
         return metric
 
 
@@ -1,13 +1,16 @@
 """Exercise 02_calculate_metric.py - Refactored."""
 
+import math
 from abc import ABC, abstractmethod
-from typing import Any, Protocol, runtime_checkable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Protocol, runtime_checkable
 
+import numpy as np
 import pandas as pd
 from sklearn.datasets import fetch_california_housing, load_iris
 from sklearn.linear_model import LinearRegression
-from sklearn.metrics import accuracy_score, r2_score
-from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, mean_absolute_error, r2_score
 from sklearn.tree import DecisionTreeClassifier
 
 
@@ -37,6 +40,11 @@ class CalculateMetricBaseModel(ABC):
         """Calculate metric abstract method."""
         pass
 
+    @abstractmethod
+    def calculate_metrics(self, *args, **kwargs) -> dict[str, Any]:
+        """Calculate several metrics abstract method."""
+        pass
+
 
 class CalculateMetricMixin:
     """Mixin class providing a concrete implementation for calculate_metric."""
@@ -47,6 +55,25 @@ class CalculateMetricMixin:
         metric = self.metric_function(target, predicted_target)
         return metric
 
+    def calculate_metrics(
+        self,
+        features: pd.DataFrame,
+        target: pd.Series,
+        metric_functions: Mapping[str, Callable] | None = None,
+    ) -> dict[str, Any]:
+        """Calculate several metrics on a single prediction.
+
+        :param features: Features to predict the target with.
+        :param target: True values of the target.
+        :param metric_functions: Metric functions by name, defaults to the metric function of the model, named after
+            the function or "metric" for callables without a name such as `functools.partial`.
+        :return: Metrics by name.
+        """
+        if metric_functions is None:
+            metric_functions = {getattr(self.metric_function, "__name__", "metric"): self.metric_function}
+        predicted_target = self.model.predict(features)
+        return {name: metric_function(target, predicted_target) for name, metric_function in metric_functions.items()}
+
 
 class ClassifierModel(CalculateMetricMixin, CalculateMetricBaseModel):
     """Classifier model type."""
@@ -68,24 +95,177 @@ class RegressorModel(CalculateMetricMixin, CalculateMetricBaseModel):
         super().__init__(model, metric_function)
 
 
+def calculate_metrics_concurrently(
+    evaluations: Iterable[tuple[CalculateMetricBaseModel, pd.DataFrame, pd.Series]],
+    metric_functions: Mapping[str, Callable] | None = None,
+    max_workers: int | None = None,
+) -> list[dict[str, Any]]:
+    """Calculate the metrics of several models concurrently in a thread pool.
+
+    Threads suffice, since the predictions of scikit-learn models release the GIL for most of their work.
+
+    :param evaluations: Models together with the features and target to evaluate them on.
+    :param metric_functions: Metric functions by name, defaults to the metric function of each model.
+    :param max_workers: Maximum number of threads.
+    :return: Metrics by name for every model, in the order of the evaluations.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(model.calculate_metrics, features, target, metric_functions)
+                   for model, features, target in evaluations]
+        return [future.result() for future in futures]
+
+
+def train_test_split_indices(
+    n_samples: int,
+    test_size: float = 0.25,
+    random_state: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Split the row indices of a dataset into random training and testing indices.
+
+    :param n_samples: Number of rows of the dataset.
+    :param test_size: Fraction of the rows in the testing set.
+    :param random_state: Seed of the random permutation of the rows.
+    :return: Training and testing row indices.
+    """
+    permutation = np.random.default_rng(random_state).permutation(n_samples)
+    n_test_samples = math.ceil(test_size * n_samples)
+    return permutation[n_test_samples:], permutation[:n_test_samples]
+
+
+class FeatureStoreView(NamedTuple):
+    """View of a contiguous range of rows of a feature store, without copying them."""
+
+    features: np.ndarray
+    target: np.ndarray
+    indices: np.ndarray
+
+
+class FeatureStore:
+    """Features and target of a dataset, stored once in a shuffled row order.
+
+    Since the rows are shuffled when creating the store, every training and testing split is a contiguous range of
+    rows and the splits are views into the store instead of copies. The store can be memory-mapped to `.npy` files,
+    so that datasets larger than the memory can be split and passed to `fit` and `calculate_metric`.
+    """
+
+    def __init__(self, features: np.ndarray, target: np.ndarray, indices: np.ndarray) -> None:
+        """Instantiate a feature store.
+
+        :param features: Features in the stored row order.
+        :param target: Target in the stored row order.
+        :param indices: Original row index of every stored row.
+        """
+        self.features = features
+        self.target = target
+        self.indices = indices
+
+    def __len__(self) -> int:
+        """Return the number of rows in the store."""
+        return len(self.indices)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        features: np.ndarray,
+        target: np.ndarray,
+        random_state: int | None = None,
+        shuffle: bool = True,
+        path: str | None = None,
+        chunk_size: int = 100_000,
+        inplace: bool = False,
+    ) -> "FeatureStore":
+        """Create a feature store from arrays of features and target.
+
+        By default, the rows are copied chunk by chunk into the store, which is kept in memory or memory-mapped, and
+        the arrays are left untouched. With `inplace`, the store takes over the arrays without copying them instead:
+        they are shuffled in place, so the caller's arrays are consumed and end up in the stored row order.
+
+        :param features: Features of shape (rows, features).
+        :param target: Target of shape (rows,).
+        :param random_state: Seed of the random permutation of the rows.
+        :param shuffle: Shuffle the rows. Without shuffling, an in-memory store refers to the arrays without copies.
+        :param path: Path prefix of the `.npy` files to memory-map the store to, the store is kept in memory otherwise.
+        :param chunk_size: Number of rows copied into the store at once.
+        :param inplace: Shuffle the arrays in place instead of copying them, only for stores kept in memory.
+        :raises ValueError: If the arrays should be shuffled in place, but are not writeable or a path is given.
+        """
+        n_samples = len(features)
+        rng = np.random.default_rng(random_state)
+        if inplace:
+            if path is not None:
+                raise ValueError("A memory-mapped store cannot take over the arrays in place.")
+            if not (isinstance(features, np.ndarray) and features.flags.writeable
+                    and isinstance(target, np.ndarray) and target.flags.writeable):
+                raise ValueError("Only writeable arrays can be shuffled in place.")
+            if not shuffle:
+                return cls(features, target, np.arange(n_samples))
+            # Replaying the state of the generator shuffles the features, target and indices with the same permutation
+            initial_state = rng.bit_generator.state
+            rng.shuffle(features)
+            rng.bit_generator.state = initial_state
+            rng.shuffle(target)
+            rng.bit_generator.state = initial_state
+            return cls(features, target, rng.permutation(n_samples))
+        if path is None and not shuffle:
+            return cls(np.asarray(features), np.asarray(target), np.arange(n_samples))
+
+        indices = rng.permutation(n_samples) if shuffle else np.arange(n_samples)
+        stored_features = cls._allocate(path, "features", features.shape, features.dtype)
+        stored_target = cls._allocate(path, "target", target.shape, target.dtype)
+        for start in range(0, n_samples, chunk_size):
+            chunk_indices = indices[start:start + chunk_size]
+            stored_features[start:start + chunk_size] = features[chunk_indices]
+            stored_target[start:start + chunk_size] = target[chunk_indices]
+        if path is not None:
+            np.save(f"{path}_indices.npy", indices)
+        return cls(stored_features, stored_target, indices)
+
+    @classmethod
+    def open(cls, path: str) -> "FeatureStore":
+        """Open a feature store that was memory-mapped to the `.npy` files with the given path prefix."""
+        return cls(
+            np.load(f"{path}_features.npy", mmap_mode="r"),
+            np.load(f"{path}_target.npy", mmap_mode="r"),
+            np.load(f"{path}_indices.npy", mmap_mode="r"),
+        )
+
+    def train_test_split(self, test_size: float = 0.25) -> tuple[FeatureStoreView, FeatureStoreView]:
+        """Split the store into training and testing views.
+
+        The split is the same as the one of `train_test_split_indices` with the `random_state` of the store.
+
+        :param test_size: Fraction of the rows in the testing set.
+        :return: Training and testing views.
+        """
+        n_test_samples = math.ceil(test_size * len(self))
+        return self.view(n_test_samples, len(self)), self.view(0, n_test_samples)
+
+    def view(self, start: int, stop: int) -> FeatureStoreView:
+        """Return a view of the stored rows from `start` to `stop`."""
+        return FeatureStoreView(self.features[start:stop], self.target[start:stop], self.indices[start:stop])
+
+    @staticmethod
+    def _allocate(path: str | None, name: str, shape: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Allocate an array in memory, or memory-mapped to a `.npy` file if a path is given."""
+        if path is None:
+            return np.empty(shape, dtype=dtype)
+        return np.lib.format.open_memmap(f"{path}_{name}.npy", mode="w+", dtype=dtype, shape=shape)
+
+
 if __name__ == "__main__":
     # Load datasets
     iris = load_iris()
     housing = fetch_california_housing()
 
-    # Split datasets into training and testing sets
-    X_train_cls, X_test_cls, y_train_cls, y_test_cls = train_test_split(
-        iris.data,
-        iris.target,
-        test_size=0.3,
-        random_state=42,
-    )
-    X_train_reg, X_test_reg, y_train_reg, y_test_reg = train_test_split(
-        housing.data,
-        housing.target,
-        test_size=0.3,
-        random_state=42,
-    )
+    # Store datasets once and split them into training and testing views without copying
+    train_cls, test_cls = FeatureStore.from_arrays(iris.data, iris.target, random_state=42).train_test_split(0.3)
+    X_train_cls, y_train_cls, _ = train_cls
+    X_test_cls, y_test_cls, _ = test_cls
+    # The housing arrays are not used otherwise, so the store can shuffle them in place instead of copying them
+    housing_store = FeatureStore.from_arrays(housing.data, housing.target, random_state=42, inplace=True)
+    train_reg, test_reg = housing_store.train_test_split(0.3)
+    X_train_reg, y_train_reg, _ = train_reg
+    X_test_reg, y_test_reg, _ = test_reg
 
     classifier = ClassifierModel()
     classifier.model.fit(X_train_cls, y_train_cls)
@@ -94,3 +274,17 @@ if __name__ == "__main__":
     regressor = RegressorModel()
     regressor.model.fit(X_train_reg, y_train_reg)
     print(regressor.calculate_metric(X_test_reg, y_test_reg))
+
+    # Calculate several metrics with a single prediction
+    print(classifier.calculate_metrics(X_test_cls, y_test_cls, {
+        "accuracy": accuracy_score,
+        "f1": partial(f1_score, average="macro"),
+        "confusion_matrix": confusion_matrix,
+    }))
+
+    # Calculate the metrics of several models concurrently
+    print(calculate_metrics_concurrently([
+        (classifier, X_test_cls, y_test_cls),
+        (regressor, X_test_reg, y_test_reg),
+    ]))
+    print(regressor.calculate_metrics(X_test_reg, y_test_reg, {"r2": r2_score, "mae": mean_absolute_error}))
@@ -13,6 +13,10 @@ that your modification might have for the user.
 """
 
 import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Iterable
+
+import numpy as np
 
 
 class Ellipse:
@@ -69,6 +73,283 @@ def double_ellipse_semi_major_axis(ellipse: Ellipse) -> None:
     ellipse.set_semi_major_axis(ellipse.semi_major_axis * 2)
 
 
+class CompactEllipse:
+    """Memory-lean ellipse in Cartesian coordinates, without a per-instance `__dict__`.
+
+    Provides the interface of `Ellipse`. The area is computed on first access and cached until a semi axis is set to
+    a new value. The rarely used eccentricity and perimeter are computed on demand, so that they take no memory.
+    """
+
+    __slots__ = ("_semi_major_axis", "_semi_minor_axis", "_area")
+
+    def __init__(self, semi_major_axis: float, semi_minor_axis: float):
+        """Initialize CompactEllipse instance by passing the semi axes."""
+        self._semi_major_axis = semi_major_axis
+        self._semi_minor_axis = semi_minor_axis
+        self._area: float | None = None
+
+    @classmethod
+    def from_radius(cls, radius: float) -> "CompactEllipse":
+        """Initialize a circle as an ellipse with equal semi axes."""
+        return cls(radius, radius)
+
+    def __repr__(self) -> str:
+        """Create the string representation of a CompactEllipse instance."""
+        return (f"{self.__class__.__name__}(semi-major-axis: {self._semi_major_axis}, "
+                f"semi-minor-axis: {self._semi_minor_axis})")
+
+    @property
+    def semi_major_axis(self) -> float:
+        """Semi major axis property method."""
+        return self._semi_major_axis
+
+    @property
+    def semi_minor_axis(self) -> float:
+        """Semi minor axis property method."""
+        return self._semi_minor_axis
+
+    @property
+    def is_circle(self) -> bool:
+        """Check if the ellipse is a circle."""
+        return self._semi_major_axis == self._semi_minor_axis
+
+    @property
+    def area(self) -> float:
+        """Ellipse area as cached property."""
+        if self._area is None:
+            self._area = math.pi * self._semi_major_axis * self._semi_minor_axis
+        return self._area
+
+    @property
+    def eccentricity(self) -> float:
+        """Ellipse eccentricity as property."""
+        longer_axis = max(self._semi_major_axis, self._semi_minor_axis)
+        shorter_axis = min(self._semi_major_axis, self._semi_minor_axis)
+        return math.sqrt(1 - (shorter_axis / longer_axis) ** 2) if longer_axis else 0.0
+
+    @property
+    def perimeter(self) -> float:
+        """Ramanujan's approximation of the ellipse perimeter as property."""
+        axes_sum = self._semi_major_axis + self._semi_minor_axis
+        h = ((self._semi_major_axis - self._semi_minor_axis) / axes_sum) ** 2 if axes_sum else 0.0
+        return math.pi * axes_sum * (1 + 3 * h / (10 + math.sqrt(4 - 3 * h)))
+
+    def set_semi_major_axis(self, semi_major_axis: float) -> None:
+        """Set semi major axis to a new value."""
+        self._semi_major_axis = semi_major_axis
+        self._area = None
+
+    def set_semi_minor_axis(self, semi_minor_axis: float) -> None:
+        """Set semi minor axis to a new value."""
+        self._semi_minor_axis = semi_minor_axis
+        self._area = None
+
+
+class EllipseArray:
+    """Columnar collection of ellipses, storing the semi axes as contiguous float arrays.
+
+    The area and the axis-scaling operations are vectorized over all ellipses. A circle is not a subclass here but a
+    row whose semi axes are equal, see `circles`.
+    """
+
+    def __init__(self, semi_major_axes: np.ndarray, semi_minor_axes: np.ndarray):
+        """Initialize the collection with one semi major and one semi minor axis per ellipse."""
+        self.semi_major_axes = np.ascontiguousarray(semi_major_axes, dtype=np.float64)
+        self.semi_minor_axes = np.ascontiguousarray(semi_minor_axes, dtype=np.float64)
+        if self.semi_major_axes.shape != self.semi_minor_axes.shape or self.semi_major_axes.ndim != 1:
+            raise ValueError("The semi axes need to be one-dimensional arrays of the same length.")
+
+    @classmethod
+    def from_circles(cls, radii: np.ndarray) -> "EllipseArray":
+        """Initialize a collection of circles given their radii."""
+        radii = np.asarray(radii, dtype=np.float64)
+        return cls(radii.copy(), radii.copy())
+
+    def __repr__(self) -> str:
+        """Create the string representation of an EllipseArray instance."""
+        return f"{self.__class__.__name__}(size: {len(self)})"
+
+    def __len__(self) -> int:
+        """Return the number of ellipses."""
+        return len(self.semi_major_axes)
+
+    def __getitem__(self, index: int) -> "EllipseRow":
+        """Return a view of a single ellipse that behaves like an Ellipse."""
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Index {index} is out of range for {len(self)} ellipses.")
+        return EllipseRow(self, index % len(self))
+
+    @property
+    def area(self) -> np.ndarray:
+        """Calculates the areas of all ellipses as property."""
+        return math.pi * self.semi_major_axes * self.semi_minor_axes
+
+    @property
+    def circles(self) -> np.ndarray:
+        """Boolean mask of the ellipses that are circles."""
+        return self.semi_major_axes == self.semi_minor_axes
+
+    def set_semi_major_axes(self, semi_major_axes: np.ndarray | float, where: np.ndarray | None = None) -> None:
+        """Set the semi major axes to new values, optionally only where the boolean mask `where` is true."""
+        np.copyto(self.semi_major_axes, semi_major_axes, where=True if where is None else where)
+
+    def set_semi_minor_axes(self, semi_minor_axes: np.ndarray | float, where: np.ndarray | None = None) -> None:
+        """Set the semi minor axes to new values, optionally only where the boolean mask `where` is true."""
+        np.copyto(self.semi_minor_axes, semi_minor_axes, where=True if where is None else where)
+
+    def scale_semi_major_axes(self, factor: np.ndarray | float, where: np.ndarray | None = None) -> None:
+        """Multiply the semi major axes in place, optionally only where the boolean mask `where` is true."""
+        np.multiply(self.semi_major_axes, factor, out=self.semi_major_axes, where=True if where is None else where)
+
+    def scale_semi_minor_axes(self, factor: np.ndarray | float, where: np.ndarray | None = None) -> None:
+        """Multiply the semi minor axes in place, optionally only where the boolean mask `where` is true."""
+        np.multiply(self.semi_minor_axes, factor, out=self.semi_minor_axes, where=True if where is None else where)
+
+
+class EllipseRow(Ellipse):
+    """View of a single ellipse of an EllipseArray.
+
+    Reading and setting the semi axes reads and writes the arrays of the collection.
+    """
+
+    def __init__(self, ellipses: EllipseArray, index: int):
+        """Initialize the view of the ellipse at `index` of the collection."""
+        self._ellipses = ellipses
+        self._index = index
+
+    @property
+    def _semi_major_axis(self) -> float:
+        return float(self._ellipses.semi_major_axes[self._index])
+
+    @_semi_major_axis.setter
+    def _semi_major_axis(self, semi_major_axis: float) -> None:
+        self._ellipses.semi_major_axes[self._index] = semi_major_axis
+
+    @property
+    def _semi_minor_axis(self) -> float:
+        return float(self._ellipses.semi_minor_axes[self._index])
+
+    @_semi_minor_axis.setter
+    def _semi_minor_axis(self, semi_minor_axis: float) -> None:
+        self._ellipses.semi_minor_axes[self._index] = semi_minor_axis
+
+
+class ObservableEllipse(Ellipse):
+    """Ellipse that notifies its observers whenever a semi axis is set to a new value."""
+
+    def __init__(self, semi_major_axis: float, semi_minor_axis: float):
+        """Initialize ObservableEllipse instance by passing the semi axes."""
+        super().__init__(semi_major_axis, semi_minor_axis)
+        self._observers: list[Callable[[Ellipse], None]] = []
+
+    def add_observer(self, observer: Callable[[Ellipse], None]) -> None:
+        """Add an observer that is called with the ellipse after a semi axis is set."""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: Callable[[Ellipse], None]) -> None:
+        """Remove an observer."""
+        self._observers.remove(observer)
+
+    def set_semi_major_axis(self, semi_major_axis: float) -> None:
+        """Set semi major axis to a new value and notify the observers."""
+        super().set_semi_major_axis(semi_major_axis)
+        self._notify_observers()
+
+    def set_semi_minor_axis(self, semi_minor_axis: float) -> None:
+        """Set semi minor axis to a new value and notify the observers."""
+        super().set_semi_minor_axis(semi_minor_axis)
+        self._notify_observers()
+
+    def _notify_observers(self) -> None:
+        """Call all observers with the ellipse."""
+        for observer in self._observers:
+            observer(self)
+
+
+class EllipseRangeIndex:
+    """Index of a collection of ellipses for range queries on the area and the semi axes.
+
+    Every indexed property is kept in a list sorted by value, so a range query takes O(log n + k) for k results.
+    Members have to be an `ObservableEllipse`, which updates the index itself whenever a semi axis is set.
+    """
+
+    indexed_properties = ("area", "semi_major_axis", "semi_minor_axis")
+
+    def __init__(self, ellipses: Iterable[ObservableEllipse] = ()):
+        """Initialize the index with a collection of ellipses."""
+        self._members: dict[int, tuple[ObservableEllipse, tuple[float, ...]]] = {}
+        self._sorted_values: dict[str, list[tuple[float, int]]] = {name: [] for name in self.indexed_properties}
+        for ellipse in ellipses:
+            self.add(ellipse)
+
+    def __len__(self) -> int:
+        """Return the number of indexed ellipses."""
+        return len(self._members)
+
+    def __contains__(self, ellipse: Ellipse) -> bool:
+        """Check if an ellipse is indexed."""
+        return id(ellipse) in self._members
+
+    def add(self, ellipse: ObservableEllipse) -> None:
+        """Add an ellipse to the index.
+
+        :raises TypeError: If the ellipse is not an `ObservableEllipse`, whose changes could not be tracked.
+        """
+        if not isinstance(ellipse, ObservableEllipse):
+            raise TypeError(f"Only an ObservableEllipse can be indexed, got {ellipse!r}.")
+        if ellipse in self:
+            return
+        self._insert(ellipse)
+        ellipse.add_observer(self.update)
+
+    def remove(self, ellipse: ObservableEllipse) -> None:
+        """Remove an ellipse from the index."""
+        self._delete(ellipse)
+        ellipse.remove_observer(self.update)
+
+    def update(self, ellipse: ObservableEllipse) -> None:
+        """Update the indexed values of an ellipse after it changed, called by the ellipse itself."""
+        self._delete(ellipse)
+        self._insert(ellipse)
+
+    def query(self, name: str, minimum: float = -math.inf, maximum: float = math.inf) -> list[ObservableEllipse]:
+        """Return the ellipses whose property lies between the minimum and the maximum, both inclusive.
+
+        :param name: Name of the property, one of `indexed_properties`.
+        :param minimum: Lower bound of the property.
+        :param maximum: Upper bound of the property.
+        :return: Ellipses sorted by the property.
+        """
+        sorted_values = self._sorted_values[name]
+        start = bisect_left(sorted_values, (minimum, -math.inf))
+        stop = bisect_right(sorted_values, (maximum, math.inf))
+        return [self._members[key][0] for _, key in sorted_values[start:stop]]
+
+    def _insert(self, ellipse: ObservableEllipse) -> None:
+        """Insert the property values of an ellipse into the sorted lists."""
+        key = id(ellipse)
+        values = tuple(getattr(ellipse, name) for name in self.indexed_properties)
+        self._members[key] = (ellipse, values)
+        for name, value in zip(self.indexed_properties, values):
+            insort(self._sorted_values[name], (value, key))
+
+    def _delete(self, ellipse: ObservableEllipse) -> None:
+        """Delete the property values of an ellipse from the sorted lists."""
+        key = id(ellipse)
+        _, values = self._members.pop(key)
+        for name, value in zip(self.indexed_properties, values):
+            sorted_values = self._sorted_values[name]
+            del sorted_values[bisect_left(sorted_values, (value, key))]
+
+
+def double_ellipse_array_semi_major_axes(ellipses: EllipseArray) -> None:
+    """Change the semi major axes of all ellipses of an EllipseArray by doubling the values.
+
+    Batch version of the user implementation `double_ellipse_semi_major_axis`.
+    """
+    ellipses.scale_semi_major_axes(2)
+
+
 if __name__ == "__main__":
     semi_major_ax = 3
     semi_minor_ax = 2
@@ -91,3 +372,26 @@ if __name__ == "__main__":
     print(c)
     print(f"Circle area: {c.area}")
     print(f"Is circle? {isinstance(c, Circle)}")
+
+    # Does it work with the memory-lean CompactEllipse?
+    compact_ellipse = CompactEllipse(semi_major_ax, semi_minor_ax)
+    print(f"Compact ellipse area: {compact_ellipse.area}, perimeter: {compact_ellipse.perimeter:.4f}")
+    double_ellipse_semi_major_axis(compact_ellipse)
+    print(compact_ellipse)
+    print(f"Compact ellipse area: {compact_ellipse.area}, eccentricity: {compact_ellipse.eccentricity:.4f}")
+
+    # Does it work with many ellipses at once?
+    ellipses = EllipseArray(np.array([3.0, 2.0, 1.0]), np.array([2.0, 2.0, 1.0]))
+    print(f"Ellipse areas: {ellipses.area}, circles: {ellipses.circles}")
+    double_ellipse_array_semi_major_axes(ellipses)
+    print(f"Ellipse areas: {ellipses.area}, circles: {ellipses.circles}")
+    double_ellipse_semi_major_axis(ellipses[0])
+    print(ellipses[0])
+    print(f"Ellipse area: {ellipses[0].area}")
+
+    # Which ellipses have an area of at most 20?
+    ellipse_index = EllipseRangeIndex([ObservableEllipse(3, 2), ObservableEllipse(1, 1), ObservableEllipse(5, 4)])
+    small_ellipses = ellipse_index.query("area", maximum=20)
+    print(f"Small ellipses: {small_ellipses}")
+    double_ellipse_semi_major_axis(small_ellipses[-1])
+    print(f"Small ellipses: {ellipse_index.query('area', maximum=20)}")
@@ -11,6 +11,14 @@ Make sure you take the following aspects into consideration:
 """
 
 from datetime import date
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+USER_COLUMNS = ["first_name", "last_name", "is_active", "date_of_birth"]
 
 
 class User:
@@ -50,8 +58,7 @@ def process_user_data(user: User) -> str:
     if not is_user_active(user):
         return f"User {full_name} is not active."
 
-    dob = user.date_of_birth
-    birth_day, birth_month, birth_year = map(int, dob.split("."))
+    birth_day, birth_month, birth_year = parse_date_of_birth(user.date_of_birth)
     age = calculate_age(birth_day, birth_month, birth_year)
 
     return str({
@@ -82,7 +89,129 @@ def calculate_age(birth_day: int, birth_month: int, birth_year: int) -> int:
     return age
 
 
+@lru_cache(maxsize=65_536)
+def parse_date_of_birth(date_of_birth: str) -> tuple[int, int, int]:
+    """Parse a date of birth in the format dd.mm.yyyy into day, month and year, cached per distinct string."""
+    birth_day, birth_month, birth_year = map(int, date_of_birth.split("."))
+    return birth_day, birth_month, birth_year
+
+
+class AgeCalculator:
+    """Age calculator respective to a reference date that is captured once per batch or per day.
+
+    Dates of birth are parsed with the cached `parse_date_of_birth`, since they repeat heavily across users. The
+    methods `calculate_age` and `calculate_user_age` are drop-in replacements of the functions with the same names.
+    Call `refresh` per batch or per day, so that a long-lived calculator does not calculate ages at a past date.
+    """
+
+    def __init__(self, reference_date: date | None = None):
+        """Initialize an age calculator.
+
+        :param reference_date: Date to calculate the ages at, defaults to today's date.
+        """
+        self.refresh(reference_date)
+
+    def refresh(self, reference_date: date | None = None) -> None:
+        """Capture the date to calculate the ages at, defaults to today's date."""
+        self.reference_date = reference_date or date.today()
+        self._reference_month_day = (self.reference_date.month, self.reference_date.day)
+
+    def calculate_age(self, birth_day: int, birth_month: int, birth_year: int) -> int:
+        """Calculate age given a birthday day, month and year, respective to the reference date."""
+        return self.reference_date.year - birth_year - (self._reference_month_day < (birth_month, birth_day))
+
+    def calculate_user_age(self, birth_date: date) -> int:
+        """Calculate age given a birthday date, respective to the reference date."""
+        return self.calculate_age(birth_date.day, birth_date.month, birth_date.year)
+
+    def parse_many(self, dates_of_birth: Iterable[str]) -> np.ndarray:
+        """Parse dates of birth in the format dd.mm.yyyy into an int array of rows of day, month and year."""
+        parsed_dates = [parse_date_of_birth(date_of_birth) for date_of_birth in dates_of_birth]
+        return np.array(parsed_dates, dtype=np.int32).reshape(-1, 3)
+
+    def calculate_ages(self, dates_of_birth: Iterable[str]) -> np.ndarray:
+        """Calculate the ages given dates of birth in the format dd.mm.yyyy as an int array."""
+        birth_day, birth_month, birth_year = self.parse_many(dates_of_birth).T
+        reference_month, reference_day = self._reference_month_day
+        is_before_birthday = (
+            (birth_month > reference_month) | ((birth_month == reference_month) & (birth_day > reference_day))
+        )
+        return self.reference_date.year - birth_year - is_before_birthday
+
+
+def process_users_in_chunks(
+        users: Iterable[User] | str,
+        chunk_size: int = 100_000,
+        reference_date: date | None = None,
+) -> Iterator[list[str]]:
+    """Process users in chunks, with the same result per user as `process_user_data`.
+
+    :param users: Users, or the path of a CSV file with the columns first_name, last_name, is_active and
+        date_of_birth.
+    :param chunk_size: Number of users processed at once.
+    :param reference_date: Date to calculate the ages at, defaults to today's date at the start of every chunk.
+    :return: Processed user data per chunk.
+    """
+    age_calculator = AgeCalculator(reference_date)
+    for user_chunk in read_user_chunks(users, chunk_size):
+        if reference_date is None:
+            age_calculator.refresh()
+        yield process_user_chunk(user_chunk, age_calculator)
+
+
+def read_user_chunks(users: Iterable[User] | str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Read users from a CSV file or an iterable in data frames of at most `chunk_size` rows."""
+    if isinstance(users, str):
+        yield from pd.read_csv(
+            users,
+            usecols=USER_COLUMNS,
+            dtype={"first_name": str, "last_name": str, "is_active": bool, "date_of_birth": str},
+            # Names like "NA" or "null" are kept as they are, only an empty date of birth is missing
+            keep_default_na=False,
+            na_values={"date_of_birth": [""]},
+            chunksize=chunk_size,
+        )
+        return
+
+    user_iterator = iter(users)
+    while user_chunk := list(islice(user_iterator, chunk_size)):
+        yield pd.DataFrame(
+            [(user.first_name, user.last_name, user.is_active, user.date_of_birth) for user in user_chunk],
+            columns=USER_COLUMNS,
+        )
+
+
+def process_user_chunk(users: pd.DataFrame, age_calculator: AgeCalculator) -> list[str]:
+    """Process a chunk of users, with the same result per user as `process_user_data`."""
+    validate_user_chunk(users)
+
+    full_names = users["first_name"].str.capitalize() + " " + users["last_name"].str.capitalize()
+    is_active = users["is_active"].to_numpy(dtype=bool)
+    ages = iter(age_calculator.calculate_ages(users["date_of_birth"][is_active]).tolist())
+
+    return [
+        str({"name": full_name, "age": next(ages), "status": "Active"}) if is_user_active
+        else f"User {full_name} is not active."
+        for full_name, is_user_active in zip(full_names.tolist(), is_active.tolist())
+    ]
+
+
+def validate_user_chunk(users: pd.DataFrame) -> None:
+    """Check if all users of a chunk have a date of birth set."""
+    is_date_of_birth_missing = users["date_of_birth"].isna().to_numpy()
+    if is_date_of_birth_missing.any():
+        first_name, last_name, is_active, _ = users[USER_COLUMNS].iloc[int(np.argmax(is_date_of_birth_missing))]
+        validate_user_data(User(first_name, last_name, bool(is_active), None))
+
+
 if __name__ == "__main__":
     user_john = User("john", "doe", True, "12.12.1990")
     processed_user_john = process_user_data(user_john)
     print(processed_user_john)
+
+    users = [user_john, User("jane", "roe", False, "01.02.1985"), User("max", "mustermann", True, "29.02.2000")]
+    for processed_users in process_users_in_chunks(users, chunk_size=2):
+        print(processed_users)
+
+    age_calculator = AgeCalculator()
+    print(age_calculator.calculate_ages(["12.12.1990", "01.02.1985", "12.12.1990"]))
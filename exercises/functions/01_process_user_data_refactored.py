@@ -1,12 +1,27 @@
 """Exercise 01_process_user_data.py - Refactored."""
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import date
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
+
+import numpy as np
+
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
 
 
 @dataclass
 class User:
     """Class that holds user information."""
 
+    # Slots instead of a per-instance __dict__ keep single user records small
+    __slots__ = ("first_name", "last_name", "is_active", "date_of_birth")
+
     first_name: str
     last_name: str
     is_active: bool
@@ -20,6 +35,122 @@ class User:
     #     self.last_name = self.last_name.capitalize()
 
 
+class UserTable:
+    """Columnar table of users.
+
+    First and last names are dictionary-encoded: every distinct name is stored once and each user refers to it by an
+    int32 code. The active flags are stored as a boolean array and the dates of birth as int32 day numbers since
+    1970-01-01. Rows are accessed through lazy `UserRow` views that provide the `User` interface.
+    """
+
+    def __init__(
+            self,
+            first_names: tuple[str, ...],
+            first_name_codes: np.ndarray,
+            last_names: tuple[str, ...],
+            last_name_codes: np.ndarray,
+            is_active: np.ndarray,
+            birth_day_numbers: np.ndarray,
+    ):
+        """Instantiate a user table from its columns."""
+        self.first_names = first_names
+        self.first_name_codes = first_name_codes
+        self.last_names = last_names
+        self.last_name_codes = last_name_codes
+        self.is_active = is_active
+        self.birth_day_numbers = birth_day_numbers
+
+    @classmethod
+    def from_users(cls, users: Iterable[User]) -> "UserTable":
+        """Create a user table from users."""
+        first_names, last_names, is_active, birth_day_numbers = [], [], [], []
+        for user in users:
+            first_names.append(user.first_name)
+            last_names.append(user.last_name)
+            is_active.append(user.is_active)
+            birth_day_numbers.append(user.date_of_birth.toordinal() - UNIX_EPOCH_ORDINAL)
+
+        distinct_first_names, first_name_codes = dictionary_encode(first_names)
+        distinct_last_names, last_name_codes = dictionary_encode(last_names)
+        return cls(
+            distinct_first_names,
+            first_name_codes,
+            distinct_last_names,
+            last_name_codes,
+            np.array(is_active, dtype=np.bool_),
+            np.array(birth_day_numbers, dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of users."""
+        return len(self.is_active)
+
+    def __getitem__(self, index: int) -> "UserRow":
+        """Return a lazy view of the user at the index."""
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Index {index} is out of range for {len(self)} users.")
+        return UserRow(self, index % len(self))
+
+    def __iter__(self) -> Iterator["UserRow"]:
+        """Iterate over lazy views of all users."""
+        return (UserRow(self, index) for index in range(len(self)))
+
+
+class UserRow:
+    """Lazy view of a single user of a UserTable, providing the User interface."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: UserTable, index: int):
+        """Instantiate the view of the user at `index` of the table."""
+        self._table = table
+        self._index = index
+
+    def __repr__(self) -> str:
+        """Create the representation of the user, analogous to the User representation."""
+        return (f"{self.__class__.__name__}(first_name={self.first_name!r}, last_name={self.last_name!r}, "
+                f"is_active={self.is_active!r}, date_of_birth={self.date_of_birth!r})")
+
+    def __reduce__(self) -> tuple[type, tuple[str, str, bool, date]]:
+        """Pickle the view as a User instance, instead of pickling the whole table with it."""
+        return User, (self.first_name, self.last_name, self.is_active, self.date_of_birth)
+
+    @property
+    def first_name(self) -> str:
+        """First name of the user."""
+        return self._table.first_names[self._table.first_name_codes[self._index]]
+
+    @property
+    def last_name(self) -> str:
+        """Last name of the user."""
+        return self._table.last_names[self._table.last_name_codes[self._index]]
+
+    @property
+    def is_active(self) -> bool:
+        """Equals to True if the user is active."""
+        return bool(self._table.is_active[self._index])
+
+    @property
+    def date_of_birth(self) -> date:
+        """Date of birth of the user."""
+        return date.fromordinal(int(self._table.birth_day_numbers[self._index]) + UNIX_EPOCH_ORDINAL)
+
+    def to_user(self) -> User:
+        """Materialize the view as a User instance."""
+        return User(self.first_name, self.last_name, self.is_active, self.date_of_birth)
+
+
+def dictionary_encode(values: list[str]) -> tuple[tuple[str, ...], np.ndarray]:
+    """Encode strings as int32 codes into a tuple of the distinct strings."""
+    codes_by_value: dict[str, int] = {}
+    codes = np.fromiter(
+        (codes_by_value.setdefault(value, len(codes_by_value)) for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return tuple(codes_by_value), codes
+
+
 class UserNotActiveError(Exception):
     """User is not active Exception."""
 
@@ -28,13 +159,17 @@ class UserNotActiveError(Exception):
         super().__init__(f"User {user} is not active.")
 
 
-def format_active_user_information_as_string(user: User) -> str:
-    """Format active user information and return as string."""
+def format_active_user_information_as_string(user: User, reference_date: date | None = None) -> str:
+    """Format active user information and return as string.
+
+    :param user: Active user.
+    :param reference_date: Date to calculate the age at, defaults to today's date.
+    """
     check_is_user_active(user)
 
     full_name = generate_capitalized_user_full_name(user)
 
-    age = calculate_user_age(user.date_of_birth)
+    age = calculate_user_age(user.date_of_birth, reference_date)
 
     user_information = generate_user_string_representation(full_name, age, "Active")
 
@@ -54,24 +189,214 @@ def generate_capitalized_user_full_name(user: User) -> str:
     return f"{last_name}, {first_name}"
 
 
-def calculate_user_age(birth_date: date) -> int:
-    """Calculate age given a birthday date, respective to today's date."""
-    today = date.today()
+def calculate_user_age(birth_date: date, reference_date: date | None = None) -> int:
+    """Calculate age given a birthday date, respective to a reference date that defaults to today's date.
+
+    Batches of users pass the reference date, so that it is captured once per batch instead of once per user.
+    """
+    today = reference_date or date.today()
     age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
     return age
 
 
 def generate_user_string_representation(full_name: str, age: int, status: str) -> str:
     """Generate string representation of user information."""
-    user_information = str({
+    user_information = str(generate_user_record(full_name, age, status))
+    return user_information
+
+
+def generate_user_record(full_name: str, age: int, status: str) -> dict[str, Any]:
+    """Generate the record of user information."""
+    return {
         "name": full_name,
         "age": age,
         "status": status,
-        })
-    return user_information
+    }
+
+
+def serialize_json(record: dict[str, Any]) -> bytes:
+    """Serialize a record as compact JSON."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class NdjsonUserWriter:
+    """Streaming writer of user information as newline-delimited JSON.
+
+    Records are serialized directly to bytes and written in batches of about `buffer_size` bytes. A faster serializer
+    returning bytes, such as `orjson.dumps`, can be passed instead of the standard library `json` one.
+    """
+
+    def __init__(
+            self,
+            destination: str | os.PathLike | BinaryIO,
+            serializer: Callable[[dict[str, Any]], bytes] = serialize_json,
+            buffer_size: int = 1024 ** 2,
+    ):
+        """Instantiate the writer.
+
+        :param destination: Path of the file to write, or a binary file-like object.
+        :param serializer: Function serializing a record to JSON bytes.
+        :param buffer_size: Number of bytes collected before writing them to the destination.
+        """
+        self._owns_file = isinstance(destination, (str, os.PathLike))
+        self._file: BinaryIO = open(destination, "wb") if self._owns_file else destination
+        self._serializer = serializer
+        self._buffer_size = buffer_size
+        self._buffer: list[bytes] = []
+        self._buffered_bytes = 0
+        self.records_written = 0
+
+    def __enter__(self) -> "NdjsonUserWriter":
+        """Enter the writer context."""
+        return self
+
+    def __exit__(self, *exception_info: Any) -> None:
+        """Flush the writer and close the file it opened."""
+        self.close()
+
+    def write_record(self, full_name: str, age: int, status: str) -> None:
+        """Write a record of user information."""
+        line = self._serializer(generate_user_record(full_name, age, status)) + b"\n"
+        self._buffer.append(line)
+        self._buffered_bytes += len(line)
+        self.records_written += 1
+        if self._buffered_bytes >= self._buffer_size:
+            self.flush()
+
+    def write_active_user(self, user: User, reference_date: date | None = None) -> None:
+        """Write the information of an active user, raising UserNotActiveError for inactive ones."""
+        check_is_user_active(user)
+        age = calculate_user_age(user.date_of_birth, reference_date)
+        self.write_record(generate_capitalized_user_full_name(user), age, "Active")
+
+    def write_active_users(self, users: Iterable[User]) -> None:
+        """Write the information of all active users, skipping inactive ones."""
+        today = date.today()
+        for user in users:
+            if user.is_active:
+                self.write_active_user(user, today)
+
+    def flush(self) -> None:
+        """Write the buffered records to the destination."""
+        if self._buffer:
+            self._file.write(b"".join(self._buffer))
+            self._buffer.clear()
+            self._buffered_bytes = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush the writer and close the file, if the writer opened it."""
+        self.flush()
+        if self._owns_file:
+            self._file.close()
+
+
+@dataclass
+class PipelineCounters:
+    """Throughput counters of the active user pipeline."""
+
+    users: int = 0
+    active_users: int = 0
+    inactive_users: int = 0
+    failed_users: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def users_per_second(self) -> float:
+        """Processed users per second."""
+        return self.users / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class ActiveUserPipeline:
+    """Pipeline formatting the information of active users in a process pool.
+
+    Users are sent to the workers in chunks and the formatted information is yielded in the input order. Instead of
+    raising per user, inactive users and users that fail to be formatted are collected in `inactive_users` and
+    `failures`. At most `max_pending_chunks` chunks are in flight, so the memory stays bounded. The users are
+    formatted in the worker processes, so instrumentation attached in the calling process does not record them.
+    """
+
+    def __init__(self, chunk_size: int = 10_000, max_workers: int | None = None,
+                 max_pending_chunks: int | None = None):
+        """Instantiate the pipeline.
+
+        :param chunk_size: Number of users sent to a worker at once.
+        :param max_workers: Number of worker processes, defaults to the number of CPUs.
+        :param max_pending_chunks: Maximum number of chunks in flight, defaults to twice the number of workers.
+        """
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending_chunks = max_pending_chunks or 2 * self.max_workers
+        self.inactive_users: list[User] = []
+        self.failures: list[tuple[User, Exception]] = []
+        self.counters = PipelineCounters()
+
+    def run(self, users: Iterable[User]) -> Iterator[str]:
+        """Format the information of all active users, in the order of the users."""
+        start = time.perf_counter()
+        user_iterator = iter(users)
+        pending_chunks: deque[tuple[list[User], Future]] = deque()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while user_chunk := list(islice(user_iterator, self.chunk_size)):
+                pending_chunks.append((user_chunk, executor.submit(format_active_user_chunk, user_chunk)))
+                if len(pending_chunks) >= self.max_pending_chunks:
+                    yield from self._collect(*pending_chunks.popleft(), start)
+            while pending_chunks:
+                yield from self._collect(*pending_chunks.popleft(), start)
+
+    def _collect(self, user_chunk: list[User], future: Future, start: float) -> Iterator[str]:
+        """Wait for a chunk, sort its users into the outputs and update the counters."""
+        user_information, failures = future.result()
+        for index, (user, information) in enumerate(zip(user_chunk, user_information)):
+            if information is not None:
+                self.counters.active_users += 1
+                yield information
+            elif index in failures:
+                self.counters.failed_users += 1
+                self.failures.append((user, failures[index]))
+            else:
+                self.counters.inactive_users += 1
+                self.inactive_users.append(user)
+        self.counters.users += len(user_chunk)
+        self.counters.chunks += 1
+        self.counters.elapsed_seconds = time.perf_counter() - start
+
+
+def format_active_user_chunk(users: list[User]) -> tuple[list[str | None], dict[int, Exception]]:
+    """Format the information of the active users of a chunk without raising per user.
+
+    :return: The formatted information per user, None for inactive and failed users, and the failures by index.
+    """
+    user_information: list[str | None] = []
+    failures: dict[int, Exception] = {}
+    today = date.today()
+    for index, user in enumerate(users):
+        if not user.is_active:
+            user_information.append(None)
+            continue
+        try:
+            user_information.append(format_active_user_information_as_string(user, today))
+        except Exception as error:
+            user_information.append(None)
+            failures[index] = error
+    return user_information, failures
 
 
 if __name__ == "__main__":
     user_john = User("john", "doe", True, date(1990, 12, 12))
     processed_user_data = format_active_user_information_as_string(user_john)
     print(processed_user_data)
+
+    user_table = UserTable.from_users([user_john, User("jane", "doe", False, date(1985, 2, 1))])
+    print(user_table[0])
+    print(format_active_user_information_as_string(user_table[0]))
+
+    pipeline = ActiveUserPipeline(chunk_size=2, max_workers=2)
+    print(list(pipeline.run([user_john, User("jane", "doe", False, date(1985, 2, 1)), User("max", "roe", True, None)])))
+    print(f"Inactive: {pipeline.inactive_users}, failures: {pipeline.failures}, counters: {pipeline.counters}")
+
+    ndjson_output = io.BytesIO()
+    with NdjsonUserWriter(ndjson_output) as writer:
+        writer.write_active_users(user_table)
+    print(ndjson_output.getvalue().decode())
@@ -0,0 +1,312 @@
+"""Opt-in, low-overhead instrumentation of hot paths with timing spans and counters.
+
+Functions and methods are instrumented by attaching a wrapper to them, which records the latency of every call in
+an in-process histogram. While the instrumentation is disabled, the wrapper only checks a flag before calling the
+original function, and detaching restores the original function entirely.
+
+Spans and counters are recorded per process. Entry points that run in worker processes, like
+`format_active_user_information_as_string` in the process pool of `ActiveUserPipeline`, are recorded by the
+instrumentation of the worker, if it is attached and enabled there, and do not reach the histograms or the flushed
+file of the parent process.
+
+Example:
+    instrumentation.attach_default_entry_points()
+    instrumentation.enable()
+    instrumentation.start_flushing("instrumentation.jsonl", interval_seconds=60)
+
+"""
+
+import cProfile
+import functools
+import heapq
+import importlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+# Module, class or None for module-level functions, attribute, and names of the exceptions the entry point raises
+# as part of its regular control flow, which are not counted as errors
+DEFAULT_ENTRY_POINTS = [
+    ("exercises.classes.01_linear_regression_refactored", "TrainingDataStandardizer", "standardize", ()),
+    ("exercises.classes.01_linear_regression_refactored", "LinearRegressionTrainer", "train", ()),
+    ("exercises.classes.01_linear_regression_refactored", "MeanSquaredErrorEvaluator", "evaluate", ()),
+    ("exercises.functions.01_process_user_data_refactored", None, "format_active_user_information_as_string",
+     ("UserNotActiveError",)),
+]
+
+# Since Python 3.12, only one cProfile profiler can be active per process, so profiled calls never overlap
+_profiler_lock = threading.Lock()
+
+
+class LatencyHistogram:
+    """Histogram of latencies in nanoseconds with power of two buckets."""
+
+    n_buckets = 64
+
+    def __init__(self) -> None:
+        """Instantiate an empty histogram."""
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * self.n_buckets
+
+    def record(self, latency_ns: int) -> None:
+        """Record a latency, in the bucket of latencies below the next power of two."""
+        self.min_ns = latency_ns if self.count == 0 else min(self.min_ns, latency_ns)
+        self.max_ns = max(self.max_ns, latency_ns)
+        self.count += 1
+        self.total_ns += latency_ns
+        self.buckets[min(latency_ns.bit_length(), self.n_buckets - 1)] += 1
+
+    def percentile(self, percentile: float) -> int:
+        """Return an upper bound of a latency percentile in nanoseconds, given by the bucket it falls into."""
+        rank = percentile / 100 * self.count
+        cumulative_count = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            cumulative_count += bucket_count
+            if bucket_count and cumulative_count >= rank:
+                return min(2 ** bucket, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summarize the histogram."""
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "p50_ns": self.percentile(50),
+            "p99_ns": self.percentile(99),
+            "buckets": {2 ** bucket: count for bucket, count in enumerate(self.buckets) if count},
+        }
+
+
+class Instrumentation:
+    """Registry of timing spans and counters.
+
+    A span records the latency of every call in a histogram per span name. A fraction of the calls of attached
+    functions, given by `profile_sample_rate`, is run under `cProfile`, and the profiles of the `max_profiles` slowest
+    of these calls are kept per span. Sampled calls are only profiled if no other call is profiled at the same time,
+    e.g. in another thread or further up the stack, and are timed without a profile otherwise.
+    """
+
+    def __init__(self, profile_sample_rate: float = 0.0, max_profiles: int = 5) -> None:
+        """Instantiate a disabled instrumentation.
+
+        :param profile_sample_rate: Fraction of the calls of attached functions to profile.
+        :param max_profiles: Number of slowest profiled calls to keep per span.
+        """
+        self.enabled = False
+        self.profile_sample_rate = profile_sample_rate
+        self.max_profiles = max_profiles
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.counters: dict[str, int] = {}
+        self._profiles: dict[str, list[tuple[int, int, cProfile.Profile]]] = {}
+        self._profile_tie_breaker = itertools.count()
+        self._attached: dict[tuple[int, str], tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_thread: threading.Thread | None = None
+        self._stop_flushing = threading.Event()
+
+    def enable(self) -> None:
+        """Start recording spans and counters."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording spans and counters."""
+        self.enabled = False
+
+    def record(self, name: str, latency_ns: int) -> None:
+        """Record the latency of a span."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(latency_ns)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Increment a counter, if the instrumentation is enabled."""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Record the latency of the code block as a span."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - start)
+
+    def instrument(self, function: Callable, name: str,
+                   expected_exceptions: tuple[type[BaseException], ...] = ()) -> Callable:
+        """Wrap a function to record every call as a span.
+
+        :param function: Function to wrap.
+        :param name: Name of the span.
+        :param expected_exceptions: Exceptions the function raises as part of its regular control flow, which are not
+            counted as errors.
+        """
+        @functools.wraps(function)
+        def instrumented(*args: Any, **kwargs: Any) -> Any:
+            if not self.enabled:
+                return function(*args, **kwargs)
+            if (self.profile_sample_rate and random.random() < self.profile_sample_rate
+                    and _profiler_lock.acquire(blocking=False)):
+                try:
+                    return self._profile(function, name, expected_exceptions, args, kwargs)
+                finally:
+                    _profiler_lock.release()
+            return self._time(function, name, expected_exceptions, args, kwargs)
+
+        return instrumented
+
+    def attach(self, owner: Any, attribute: str, name: str | None = None,
+               expected_exceptions: tuple[type[BaseException], ...] = ()) -> None:
+        """Replace a function or method of a module or class by its instrumented version.
+
+        :param owner: Module or class that defines the function or method.
+        :param attribute: Name of the function or method.
+        :param name: Name of the span, defaults to the qualified name of the attribute.
+        :param expected_exceptions: Exceptions the function or method raises as part of its regular control flow,
+            which are not counted as errors.
+        """
+        key = (id(owner), attribute)
+        if key in self._attached:
+            return
+        original = vars(owner)[attribute]
+        owner_name = getattr(owner, "__qualname__", owner.__name__.rpartition(".")[2])
+        name = name or f"{owner_name}.{attribute}"
+        if isinstance(original, (staticmethod, classmethod)):
+            instrumented: Any = type(original)(self.instrument(original.__func__, name, expected_exceptions))
+        else:
+            instrumented = self.instrument(original, name, expected_exceptions)
+        setattr(owner, attribute, instrumented)
+        self._attached[key] = (owner, original)
+
+    def attach_default_entry_points(self) -> None:
+        """Attach to the entry points of the standardizer, trainer, evaluator and user formatting.
+
+        The entry points are only attached in the current process. Worker processes, e.g. of `ActiveUserPipeline`,
+        have to attach and enable their own instrumentation, and flush it themselves.
+        """
+        for module_name, class_name, attribute, exception_names in DEFAULT_ENTRY_POINTS:
+            module = importlib.import_module(module_name)
+            expected_exceptions = tuple(getattr(module, exception_name) for exception_name in exception_names)
+            self.attach(getattr(module, class_name) if class_name else module, attribute,
+                        expected_exceptions=expected_exceptions)
+
+    def detach_all(self) -> None:
+        """Restore all functions and methods that were attached to."""
+        for (_, attribute), (owner, original) in self._attached.items():
+            setattr(owner, attribute, original)
+        self._attached.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Summarize all spans and counters."""
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "pid": os.getpid(),
+                "spans": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def flush(self, path: str) -> None:
+        """Append a snapshot of all spans and counters as a JSON line to a file."""
+        with open(path, "a") as output_file:
+            output_file.write(json.dumps(self.snapshot()) + "\n")
+
+    def start_flushing(self, path: str, interval_seconds: float = 60.0) -> None:
+        """Flush periodically to a file in a background thread."""
+        if self._flush_thread is not None:
+            return
+        self._stop_flushing.clear()
+
+        def flush_periodically() -> None:
+            while not self._stop_flushing.wait(interval_seconds):
+                self.flush(path)
+
+        self._flush_thread = threading.Thread(target=flush_periodically, name="instrumentation-flush", daemon=True)
+        self._flush_thread.start()
+
+    def stop_flushing(self) -> None:
+        """Stop the periodic flushing."""
+        if self._flush_thread is not None:
+            self._stop_flushing.set()
+            self._flush_thread.join()
+            self._flush_thread = None
+
+    def dump_profiles(self, directory: str) -> list[str]:
+        """Write the profiles of the slowest profiled calls as `pstats` files.
+
+        :return: Paths of the written files, readable with `pstats.Stats(path)`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        with self._lock:
+            profiles = {name: list(slowest_profiles) for name, slowest_profiles in self._profiles.items()}
+        for name, slowest_profiles in profiles.items():
+            for latency_ns, _, profile in sorted(slowest_profiles, key=lambda item: item[0], reverse=True):
+                path = os.path.join(directory, f"{name}.{latency_ns}ns.prof")
+                profile.dump_stats(path)
+                paths.append(path)
+        return paths
+
+    def _time(self, function: Callable, name: str, expected_exceptions: tuple[type[BaseException], ...],
+              args: tuple, kwargs: dict[str, Any]) -> Any:
+        """Call a function, recording its latency as a span."""
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        except expected_exceptions:
+            raise
+        except Exception:
+            self.increment(f"{name}.errors")
+            raise
+        finally:
+            self.record(name, time.perf_counter_ns() - start)
+
+    def _profile(self, function: Callable, name: str, expected_exceptions: tuple[type[BaseException], ...],
+                 args: tuple, kwargs: dict[str, Any]) -> Any:
+        """Call a function under cProfile, keeping the profile if the call is among the slowest profiled ones.
+
+        If the profiler cannot be started, e.g. because another profiling tool is active, the call is only timed.
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return self._time(function, name, expected_exceptions, args, kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        except expected_exceptions:
+            raise
+        except Exception:
+            self.increment(f"{name}.errors")
+            raise
+        finally:
+            profile.disable()
+            latency_ns = time.perf_counter_ns() - start
+            self.record(name, latency_ns)
+            with self._lock:
+                slowest_profiles = self._profiles.setdefault(name, [])
+                entry = (latency_ns, next(self._profile_tie_breaker), profile)
+                if len(slowest_profiles) < self.max_profiles:
+                    heapq.heappush(slowest_profiles, entry)
+                elif latency_ns > slowest_profiles[0][0]:
+                    heapq.heapreplace(slowest_profiles, entry)
+
+
+instrumentation = Instrumentation()
@@ -9,7 +9,10 @@ __getitem__, __setitem__, __delitem__, __len__, insert
 """
 
 from collections import abc
-from typing import Any, NamedTuple
+from itertools import product
+from typing import Any, Iterable, Iterator, NamedTuple
+
+import numpy as np
 
 
 class Card(NamedTuple):
@@ -22,41 +25,158 @@ class Card(NamedTuple):
 #@abc.MutableSequence.register
 #class CardDeck:
 class CardDeck(abc.MutableSequence):
-    """A French Deck card sequence."""
+    """A French Deck card sequence.
+
+    The cards are stored as small integer codes in a `bytearray` and materialized as `Card` instances from a table
+    shared by all decks, so that creating and copying a deck only copies a few bytes.
+    """
 
     ranks = [str(rank) for rank in range(2, 11)] + list("JQKA")
     suits = ["clubs", "spades", "diamonds", "hearts"]
 
+    _cards_by_code = tuple(Card(rank, suit) for rank, suit in product(ranks, suits))
+    _codes_by_card = {card: code for code, card in enumerate(_cards_by_code)}
+    _full_deck_codes = bytes(range(len(_cards_by_code)))
+
     def __init__(self) -> None:
         """Instantiate a French Deck."""
-        self._cards = [Card(rank, suit) for rank in self.ranks
-                       for suit in self.suits]
+        self._codes = bytearray(self._full_deck_codes)
+
+    @classmethod
+    def from_codes(cls, codes: Iterable[int]) -> "CardDeck":
+        """Instantiate a deck from card codes, the positions of the cards in a new French Deck."""
+        card_deck = cls.__new__(cls)
+        card_deck._codes = bytearray(codes)
+        if card_deck._codes and max(card_deck._codes) >= len(cls._cards_by_code):
+            raise ValueError("Card codes need to be smaller than the number of cards in a French Deck.")
+        return card_deck
+
+    @property
+    def codes(self) -> bytes:
+        """Card codes of the deck."""
+        return bytes(self._codes)
+
+    def copy(self) -> "CardDeck":
+        """Copy the French Deck."""
+        return self.from_codes(self._codes)
+
+    __copy__ = copy
 
     def __getitem__(self, position) -> Any:
         """Return the position of a card."""
-        return self._cards[position]
+        if isinstance(position, slice):
+            return [self._cards_by_code[code] for code in self._codes[position]]
+        return self._cards_by_code[self._codes[position]]
 
     def __setitem__(self, position, value) -> None:
         """Set the position of a card.
 
         All we need to enable shuffling.
         """
-        self._cards[position] = value
+        if isinstance(position, slice):
+            self._codes[position] = bytes(self._encode(card) for card in value)
+        else:
+            self._codes[position] = self._encode(value)
 
     def __len__(self) -> int:
         """Calculate the length of the French Deck."""
-        return len(self._cards)
+        return len(self._codes)
 
     def __delitem__(self, position) -> None:
         """Delete a card from the French Deck."""
-        del self._cards[position]
+        del self._codes[position]
 
     def insert(self, position: int, value: Card):
         """Insert a new card into the French Deck."""
-        self._cards.insert(position, value)
+        self._codes.insert(position, self._encode(value))
+
+    def __iter__(self) -> Iterator[Card]:
+        """Iterate over the cards of the French Deck."""
+        return map(self._cards_by_code.__getitem__, self._codes)
+
+    def __contains__(self, value) -> bool:
+        """Check if a card is in the French Deck."""
+        code = self._codes_by_card.get(value) if isinstance(value, tuple) else None
+        return code is not None and code in self._codes
+
+    def _encode(self, card: Card) -> int:
+        """Return the code of a card."""
+        try:
+            return self._codes_by_card[card]
+        except (KeyError, TypeError):
+            raise ValueError(f"{card!r} is not a card of the French Deck.") from None
+
+
+class CardDeckBatch:
+    """Batch of French Decks as an (N, 52) matrix of card codes, for vectorized Monte Carlo simulations.
+
+    A card code is the position of the card in a new `CardDeck`, so its rank is `code // 4` and its suit `code % 4`,
+    indexing `CardDeck.ranks` and `CardDeck.suits`.
+    """
+
+    n_suits = len(CardDeck.suits)
+    n_ranks = len(CardDeck.ranks)
+
+    def __init__(self, n_decks: int, seed: int | None = None) -> None:
+        """Instantiate a batch of new French Decks with a seeded random generator."""
+        self.random_generator = np.random.default_rng(seed)
+        self.codes = np.tile(np.frombuffer(CardDeck().codes, dtype=np.uint8), (n_decks, 1))
+
+    def __len__(self) -> int:
+        """Return the number of decks."""
+        return len(self.codes)
+
+    def shuffle(self) -> None:
+        """Shuffle every deck independently, in place."""
+        self.random_generator.permuted(self.codes, axis=1, out=self.codes)
+
+    def deal(self, n_hands: int, hand_size: int) -> np.ndarray:
+        """Deal hands from the top of every deck.
+
+        :return: Card codes of shape (decks, hands, hand size), a view into the decks.
+        """
+        if n_hands * hand_size > self.codes.shape[1]:
+            raise ValueError(f"Cannot deal {n_hands} hands of {hand_size} cards from a deck of "
+                             f"{self.codes.shape[1]} cards.")
+        return self.codes[:, :n_hands * hand_size].reshape(len(self), n_hands, hand_size)
+
+    @classmethod
+    def hand_statistics(cls, hands: np.ndarray) -> dict[str, np.ndarray]:
+        """Calculate simple statistics of every hand.
+
+        :param hands: Card codes of shape (..., hand size), e.g. as dealt by `deal`.
+        :return: Arrays of shape (...) with the number of pairs, three and four of a kind per hand, whether a hand is
+            a flush and its high card points (jack 1, queen 2, king 3, ace 4).
+        """
+        ranks = hands // cls.n_suits
+        suits = hands % cls.n_suits
+
+        hand_offsets = np.arange(ranks[..., 0].size).reshape(ranks.shape[:-1])[..., np.newaxis] * cls.n_ranks
+        rank_counts = np.bincount((ranks + hand_offsets).ravel(), minlength=ranks[..., 0].size * cls.n_ranks)
+        rank_counts = rank_counts.astype(np.uint8).reshape(*ranks.shape[:-1], cls.n_ranks)
+
+        return {
+            "pairs": (rank_counts == 2).sum(axis=-1),
+            "three_of_a_kind": (rank_counts == 3).sum(axis=-1),
+            "four_of_a_kind": (rank_counts == 4).sum(axis=-1),
+            "flush": (suits == suits[..., :1]).all(axis=-1),
+            "high_card_points": np.clip(ranks.astype(np.int64) - (cls.n_ranks - 5), 0, None).sum(axis=-1),
+        }
+
+    def to_card_deck(self, row: int) -> CardDeck:
+        """Convert a deck of the batch into a CardDeck."""
+        return CardDeck.from_codes(self.codes[row].tobytes())
 
 
 if __name__ == "__main__":
     card_deck = CardDeck()
     print(isinstance(card_deck, abc.MutableSequence))
     print(issubclass(CardDeck, abc.MutableSequence))
+
+    # Simulate many deals at once
+    card_deck_batch = CardDeckBatch(n_decks=100_000, seed=42)
+    card_deck_batch.shuffle()
+    hand_statistics = CardDeckBatch.hand_statistics(card_deck_batch.deal(n_hands=4, hand_size=5))
+    print(f"Probability of a pair: {(hand_statistics['pairs'] == 1).mean():.4f}")
+    print(f"Probability of a flush: {hand_statistics['flush'].mean():.4f}")
+    print(card_deck_batch.to_card_deck(0)[:5])
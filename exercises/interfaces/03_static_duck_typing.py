@@ -1,7 +1,13 @@
 """Example for static duck typing in Python. An external static type checker is required."""
 
+import asyncio
+import heapq
+import math
+import os
 import random
-from typing import Any, Iterable, Protocol, runtime_checkable
+import threading
+from itertools import count, islice
+from typing import Any, Iterable, Protocol, Sequence, runtime_checkable
 
 
 @runtime_checkable
@@ -26,7 +32,232 @@ class SimplePicker:
         return self._items.pop()
 
 
+class LazyShufflePicker:
+    """A random picker that shuffles lazily, one pick at a time.
+
+    Runs an incremental Fisher-Yates shuffle over the sequence without copying it: the positions swapped so far are
+    kept in a dictionary, so every pick costs O(1) and there is no up-front O(n) shuffle.
+    """
+
+    def __init__(self, items: Sequence, seed: int | None = None) -> None:
+        """Instantiate a lazy shuffle picker."""
+        self._items = items
+        self._remaining = len(items)
+        self._swapped_positions: dict[int, int] = {}
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        """Return the number of items left to pick."""
+        return self._remaining
+
+    def pick(self) -> Any:
+        """Pick an element."""
+        if self._remaining == 0:
+            raise IndexError("pick from empty picker")
+        position = self._random.randrange(self._remaining)
+        self._remaining -= 1
+        picked_position = self._swapped_positions.pop(position, position)
+        if position != self._remaining:
+            self._swapped_positions[position] = self._swapped_positions.pop(self._remaining, self._remaining)
+        return self._items[picked_position]
+
+
+class WeightedPicker:
+    """A weighted random picker using Walker's alias method.
+
+    Items are picked with replacement, with a probability proportional to their weight. The setup takes O(n) and every
+    pick O(1).
+    """
+
+    def __init__(self, items: Iterable, weights: Iterable[float], seed: int | None = None) -> None:
+        """Instantiate a weighted picker."""
+        self._items = list(items)
+        weights = list(weights)
+        if len(weights) != len(self._items) or not self._items:
+            raise ValueError("A weight is needed for every item, and at least one item.")
+        if any(weight < 0 for weight in weights) or sum(weights) <= 0:
+            raise ValueError("Weights need to be non-negative with a positive sum.")
+        self._probabilities, self._aliases = self._build_alias_table(weights)
+        self._random = random.Random(seed)
+
+    @staticmethod
+    def _build_alias_table(weights: list[float]) -> tuple[list[float], list[int]]:
+        """Build the probability and alias tables with Vose's variant of the alias method."""
+        n_items = len(weights)
+        total_weight = sum(weights)
+        scaled_weights = [weight * n_items / total_weight for weight in weights]
+        probabilities = [1.0] * n_items
+        aliases = list(range(n_items))
+        small = [index for index, weight in enumerate(scaled_weights) if weight < 1.0]
+        large = [index for index, weight in enumerate(scaled_weights) if weight >= 1.0]
+        while small and large:
+            small_index, large_index = small.pop(), large.pop()
+            probabilities[small_index] = scaled_weights[small_index]
+            aliases[small_index] = large_index
+            scaled_weights[large_index] -= 1.0 - scaled_weights[small_index]
+            (small if scaled_weights[large_index] < 1.0 else large).append(large_index)
+        return probabilities, aliases
+
+    def pick(self) -> Any:
+        """Pick an element."""
+        index = self._random.randrange(len(self._items))
+        if self._random.random() >= self._probabilities[index]:
+            index = self._aliases[index]
+        return self._items[index]
+
+
+class ReservoirPicker:
+    """A random picker over a uniform sample of `k` items, taken in a single pass over any iterable.
+
+    Uses reservoir sampling with Li's Algorithm L, which skips over the items that are not sampled, so iterables larger
+    than the memory or infinite generators cut by `itertools.islice` can be sampled.
+    """
+
+    def __init__(self, items: Iterable, k: int, seed: int | None = None) -> None:
+        """Instantiate a reservoir picker."""
+        if k <= 0:
+            raise ValueError("The reservoir size k needs to be positive.")
+        self._random = random.Random(seed)
+        self._items = self._sample(iter(items), k)
+        self._random.shuffle(self._items)
+
+    def _sample(self, items: Iterable, k: int) -> list:
+        """Sample k items uniformly with Algorithm L."""
+        reservoir = list(islice(items, k))
+        if len(reservoir) < k:
+            return reservoir
+
+        threshold = math.exp(math.log(1.0 - self._random.random()) / k)
+        while True:
+            skip = math.floor(math.log(1.0 - self._random.random()) / math.log(1.0 - threshold))
+            sampled_items = list(islice(items, skip, skip + 1))
+            if not sampled_items:
+                return reservoir
+            reservoir[self._random.randrange(k)] = sampled_items[0]
+            threshold *= math.exp(math.log(1.0 - self._random.random()) / k)
+
+    def __len__(self) -> int:
+        """Return the number of items left to pick."""
+        return len(self._items)
+
+    def pick(self) -> Any:
+        """Pick an element."""
+        return self._items.pop()
+
+
+class WeightedReservoirPicker(ReservoirPicker):
+    """A random picker over a weighted sample of `k` items, taken in a single pass over any iterable.
+
+    Uses the A-Res algorithm of Efraimidis and Spirakis: every item gets the random key `u ** (1 / weight)` and the
+    `k` items with the largest keys are kept in a heap.
+    """
+
+    def __init__(self, weighted_items: Iterable[tuple[Any, float]], k: int, seed: int | None = None) -> None:
+        """Instantiate a weighted reservoir picker from pairs of item and weight."""
+        super().__init__(weighted_items, k, seed)
+
+    def _sample(self, weighted_items: Iterable[tuple[Any, float]], k: int) -> list:
+        """Sample k items with A-Res, using the logarithm of the keys to avoid underflow for small weights."""
+        reservoir: list[tuple[float, int, Any]] = []
+        tie_breaker = count()
+        for item, weight in weighted_items:
+            if weight <= 0:
+                continue
+            key = math.log(1.0 - self._random.random()) / weight
+            if len(reservoir) < k:
+                heapq.heappush(reservoir, (key, next(tie_breaker), item))
+            elif key > reservoir[0][0]:
+                heapq.heapreplace(reservoir, (key, next(tie_breaker), item))
+        return [item for _, _, item in reservoir]
+
+
+class ThreadSafePicker:
+    """A random picker that can be shared by many threads.
+
+    The shuffled items are split into shards with a lock each. Every thread picks from its own shard and only steals
+    from the other shards once its own shard is empty, so the threads rarely wait for the same lock.
+    """
+
+    def __init__(self, items: Iterable, n_shards: int | None = None, seed: int | None = None) -> None:
+        """Instantiate a thread-safe picker, with one shard per CPU by default."""
+        shuffled_items = list(items)
+        random.Random(seed).shuffle(shuffled_items)
+        self._n_shards = n_shards or os.cpu_count() or 1
+        self._shards = [shuffled_items[shard::self._n_shards] for shard in range(self._n_shards)]
+        self._locks = [threading.Lock() for _ in range(self._n_shards)]
+        self._thread_shards = threading.local()
+        self._next_shard = count()
+
+    def pick(self) -> Any:
+        """Pick an element, preferably from the shard of the calling thread."""
+        home_shard = self._home_shard()
+        for offset in range(self._n_shards):
+            shard = (home_shard + offset) % self._n_shards
+            with self._locks[shard]:
+                if self._shards[shard]:
+                    return self._shards[shard].pop()
+        raise IndexError("pick from empty picker")
+
+    def _home_shard(self) -> int:
+        """Return the shard of the calling thread, assigning shards to threads round-robin."""
+        try:
+            return self._thread_shards.shard
+        except AttributeError:
+            self._thread_shards.shard = next(self._next_shard) % self._n_shards
+            return self._thread_shards.shard
+
+
+class AsyncPicker:
+    """A random picker for asyncio tasks, whose pick waits until an item is available."""
+
+    def __init__(self, items: Iterable = (), seed: int | None = None) -> None:
+        """Instantiate an asyncio picker."""
+        self._items = list(items)
+        self._random = random.Random(seed)
+        self._available = asyncio.Condition()
+
+    def __len__(self) -> int:
+        """Return the number of items left to pick."""
+        return len(self._items)
+
+    async def pick(self) -> Any:
+        """Pick an element, waiting for a refill if the picker is empty."""
+        async with self._available:
+            await self._available.wait_for(lambda: self._items)
+            position = self._random.randrange(len(self._items))
+            self._items[position], self._items[-1] = self._items[-1], self._items[position]
+            return self._items.pop()
+
+    async def refill(self, items: Iterable) -> None:
+        """Add items and wake up the tasks waiting for them."""
+        async with self._available:
+            n_items = len(self._items)
+            self._items.extend(items)
+            self._available.notify(len(self._items) - n_items)
+
+
 if __name__ == "__main__":
     simple_picker = SimplePicker(items=[1, 5, 7, 20])
     print(isinstance(simple_picker, RandomPicker))
     print(issubclass(SimplePicker, RandomPicker))
+
+    lazy_shuffle_picker = LazyShufflePicker(range(1_000_000_000), seed=42)
+    print(isinstance(lazy_shuffle_picker, RandomPicker), lazy_shuffle_picker.pick())
+
+    weighted_picker = WeightedPicker(items=["a", "b", "c"], weights=[0.7, 0.2, 0.1], seed=42)
+    print(isinstance(weighted_picker, RandomPicker), [weighted_picker.pick() for _ in range(10)])
+
+    reservoir_picker = ReservoirPicker((line_number for line_number in range(10_000_000)), k=5, seed=42)
+    print(isinstance(reservoir_picker, RandomPicker), [reservoir_picker.pick() for _ in range(5)])
+
+    thread_safe_picker = ThreadSafePicker(items=range(100), n_shards=4, seed=42)
+    print(isinstance(thread_safe_picker, RandomPicker), thread_safe_picker.pick())
+
+    async def pick_asynchronously() -> list:
+        """Pick from an asyncio picker that is refilled while the tasks are waiting."""
+        async_picker = AsyncPicker(seed=42)
+        picks = asyncio.gather(*(async_picker.pick() for _ in range(3)))
+        await async_picker.refill([1, 5, 7, 20])
+        return await picks
+
+    print(isinstance(AsyncPicker(), RandomPicker), asyncio.run(pick_asynchronously()))
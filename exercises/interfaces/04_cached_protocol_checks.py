@@ -0,0 +1,181 @@
+"""Example for cached structural conformance checks of runtime checkable protocols.
+
+`isinstance(obj, SomeProtocol)` looks up every protocol member on every call, which is slow in hot loops. Since the
+members of protocols like `RandomPicker` or `MLModelInterface` are methods defined on the class, the verdict can be
+cached per concrete class. A cached verdict is revalidated with a few attribute lookups, so that monkey-patching the
+class is still taken into account.
+"""
+
+import functools
+import inspect
+import sys
+import timeit
+import typing
+import weakref
+from typing import Any, Callable, NamedTuple, Protocol, runtime_checkable
+
+
+def get_protocol_members(protocol: type) -> frozenset[str]:
+    """Return the names of the members of a protocol."""
+    if sys.version_info >= (3, 12):
+        return frozenset(protocol.__protocol_attrs__)
+    # Before Python 3.12, protocols do not store their members, and typing computes them on every isinstance call
+    # with this private helper
+    return frozenset(typing._get_protocol_attrs(protocol))
+
+
+class ConformanceCache:
+    """Cache of the conformance of classes to runtime checkable protocols.
+
+    For every class and protocol, the cache stores which members are found on the class and which are missing. A
+    cached verdict is only reused if every found member is still found on the class and no missing member was added
+    since, which CPython answers from its per-type attribute cache. Members that are missing on the class are looked
+    up on the instance, like `isinstance` does. The cache only holds weak references to the classes, so that classes
+    created at runtime can still be garbage collected.
+    """
+
+    def __init__(self) -> None:
+        """Instantiate an empty cache."""
+        self._members: weakref.WeakKeyDictionary[type, frozenset[str]] = weakref.WeakKeyDictionary()
+        self._entries: weakref.WeakKeyDictionary[type, dict[type, ConformanceEntry]] = weakref.WeakKeyDictionary()
+
+    def conforms(self, obj: Any, protocol: type) -> bool:
+        """Check if an object structurally conforms to a protocol, analogous to `isinstance(obj, protocol)`."""
+        cls = type(obj)
+        entries = self._entries.get(cls)
+        if entries is None:
+            entries = self._entries[cls] = {}
+        entry = entries.get(protocol)
+        if entry is None or not entry.is_valid(cls):
+            entry = entries[protocol] = self._resolve(cls, protocol)
+        for member in entry.missing_members:
+            if getattr(obj, member, None) is None:
+                return False
+        return True
+
+    def clear(self) -> None:
+        """Remove all cached verdicts."""
+        self._entries.clear()
+
+    def _resolve(self, cls: type, protocol: type) -> "ConformanceEntry":
+        """Find the protocol members that are defined in the method resolution order of a class."""
+        members = self._members.get(protocol)
+        if members is None:
+            members = self._members[protocol] = get_protocol_members(protocol)
+        namespaces = [vars(base) for base in cls.__mro__]
+        found_members, missing_members = [], []
+        for member in members:
+            namespace = next((namespace for namespace in namespaces if member in namespace), None)
+            if namespace is None or namespace[member] is None:
+                missing_members.append(member)
+            else:
+                found_members.append(member)
+        return ConformanceEntry(tuple(found_members), tuple(missing_members))
+
+
+class ConformanceEntry(NamedTuple):
+    """Cached lookup of the protocol members of a class, without references to the class itself."""
+
+    found_members: tuple[str, ...]
+    missing_members: tuple[str, ...]
+
+    def is_valid(self, cls: type) -> bool:
+        """Check if the entry still describes the class."""
+        for member in self.found_members:
+            if getattr(cls, member, None) is None:
+                return False
+        for member in self.missing_members:
+            if getattr(cls, member, None) is not None:
+                return False
+        return True
+
+
+conformance_cache = ConformanceCache()
+
+
+def conforms_to(obj: Any, protocol: type) -> bool:
+    """Check if an object structurally conforms to a protocol, caching the verdict per class."""
+    return conformance_cache.conforms(obj, protocol)
+
+
+def check_protocol_arguments(**protocols: type) -> Callable[[Callable], Callable]:
+    """Validate that the arguments of a function conform to protocols.
+
+    :param protocols: Protocol by parameter name.
+    :raises TypeError: When the decorated function is called with an argument that does not conform to its protocol.
+    """
+    def decorator(function: Callable) -> Callable:
+        parameters = list(inspect.signature(function).parameters)
+        positions = {name: parameters.index(name) for name in protocols}
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for name, protocol in protocols.items():
+                position = positions[name]
+                if position < len(args):
+                    argument = args[position]
+                elif name in kwargs:
+                    argument = kwargs[name]
+                else:
+                    continue
+                if not conforms_to(argument, protocol):
+                    raise TypeError(f"Argument {name} of {function.__name__} does not conform to "
+                                    f"{protocol.__name__}: {argument!r}")
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@runtime_checkable
+class Drawer(Protocol):
+    """Drawer interface."""
+
+    def draw(self) -> None:
+        """Draw something."""
+        pass
+
+
+class Artist:
+    """Artist implementation."""
+
+    def draw(self) -> None:
+        """Draw a painting."""
+        print("Draw a painting.")
+
+
+class Sculptor:
+    """Sculptor implementation, without a draw method."""
+
+    def carve(self) -> None:
+        """Carve a sculpture."""
+        print("Carve a sculpture.")
+
+
+@check_protocol_arguments(painter=Drawer)
+def draw_a_painting(painter):
+    """Draw a painting, validating that `painter` has a method `draw()`."""
+    painter.draw()
+
+
+if __name__ == "__main__":
+    artist = Artist()
+    draw_a_painting(artist)
+    try:
+        draw_a_painting(Sculptor())
+    except TypeError as error:
+        print(error)
+
+    # Monkey-patching the class is taken into account
+    Sculptor.draw = Artist.draw
+    draw_a_painting(Sculptor())
+    del Sculptor.draw
+    print(f"Does a sculptor conform to Drawer after removing draw()? {conforms_to(Sculptor(), Drawer)}")
+
+    # Benchmark the cached check against isinstance
+    n_checks = 100_000
+    isinstance_time = timeit.timeit(lambda: isinstance(artist, Drawer), number=n_checks)
+    cached_time = timeit.timeit(lambda: conforms_to(artist, Drawer), number=n_checks)
+    print(f"isinstance: {isinstance_time / n_checks * 1e9:.0f} ns per check, "
+          f"cached: {cached_time / n_checks * 1e9:.0f} ns per check, speedup: {isinstance_time / cached_time:.1f}x")